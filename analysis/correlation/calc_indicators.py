@@ -31,6 +31,12 @@ bs_monthly = df_bs.groupby(['month', 'category_1']).size().unstack(fill_value=0)
 months = ['2025-09', '2025-10', '2025-11', '2025-12']
 categories = df_news['카테고리'].tolist()
 
+# 비율 컬럼('12.34%')은 로드 직후 한 번만 숫자로 변환
+ratio_cols = [f'{m}_비율' for m in months]
+df_news[ratio_cols] = df_news[ratio_cols].apply(
+    lambda s: s.astype(str).str.rstrip('%').astype(float)
+)
+
 print("=" * 70)
 print("가공 지표 계산 결과")
 print("=" * 70)
@@ -39,57 +45,49 @@ print("=" * 70)
 print("\n[1] 이슈 급등 지수 (Surge Index) - 전월 대비 변화율 %")
 print("-" * 70)
 
-surge_data = {}
-for cat in categories:
-    vals = [df_news[df_news['카테고리']==cat][f'{m}_기사수'].values[0] for m in months]
-    surge = []
-    for i in range(1, len(vals)):
-        if vals[i-1] > 0:
-            s = (vals[i] - vals[i-1]) / vals[i-1] * 100
-        else:
-            s = 0
-        surge.append(round(s, 1))
-    surge_data[cat] = surge
+# 카테고리 × 월 매트릭스 (기사수, 비율)
+df_news_idx = df_news.set_index('카테고리')
+news_mat = df_news_idx[[f'{m}_기사수' for m in months]].to_numpy(dtype=float)
+share_mat = df_news_idx[ratio_cols].to_numpy(dtype=float)
+
+prev_mat = news_mat[:, :-1]
+with np.errstate(divide='ignore', invalid='ignore'):
+    surge_mat = np.where(prev_mat > 0, np.diff(news_mat, axis=1) / prev_mat * 100, 0)
+surge_mat = np.round(surge_mat, 1)
+
+surge_data = dict(zip(categories, surge_mat.tolist()))
+for cat, surge in surge_data.items():
     print(f"{cat:20s}: 10월 {surge[0]:+7.1f}% | 11월 {surge[1]:+7.1f}% | 12월 {surge[2]:+7.1f}%")
 
 # 2. 카테고리 점유율 변화
 print("\n[2] 카테고리 점유율 변화 (Share Shift) - 전월 대비 %p")
 print("-" * 70)
 
-share_data = {}
-for cat in categories:
-    shares = []
-    for m in months:
-        ratio_str = df_news[df_news['카테고리']==cat][f'{m}_비율'].values[0]
-        ratio = float(ratio_str.replace('%', ''))
-        shares.append(ratio)
-
-    shift = []
-    for i in range(1, len(shares)):
-        shift.append(round(shares[i] - shares[i-1], 2))
-    share_data[cat] = shift
+shift_mat = np.round(np.diff(share_mat, axis=1), 2)
+
+share_data = dict(zip(categories, shift_mat.tolist()))
+for cat, shift in share_data.items():
     print(f"{cat:20s}: 10월 {shift[0]:+6.2f}%p | 11월 {shift[1]:+6.2f}%p | 12월 {shift[2]:+6.2f}%p")
 
 # 3. 키워드 집중도 (상위 3개 키워드 비중)
 print("\n[3] 키워드 집중도 (상위 3개 키워드 빈도 합)")
 print("-" * 70)
 
-conc_data = {}
-for cat in categories:
-    conc = []
-    for m in months:
-        m_int = int(m.replace('-', ''))
-        row = df_keywords[(df_keywords['카테고리']==cat) & (df_keywords['년월']==m_int)]
-        if len(row) > 0:
-            top3 = 0
-            for i in range(1, 4):
-                val = row[f'빈도{i}'].values[0]
-                if pd.notna(val):
-                    top3 += val
-            conc.append(int(top3))
-        else:
-            conc.append(0)
-    conc_data[cat] = conc
+# (카테고리, 년월)별 상위 3개 빈도 합 (같은 키가 여러 행이면 첫 행 기준, 결측 빈도는 0 취급)
+conc_series = (
+    df_keywords.drop_duplicates(['카테고리', '년월'])
+    .set_index(['카테고리', '년월'])[['빈도1', '빈도2', '빈도3']]
+    .sum(axis=1)
+)
+conc_mat = (
+    conc_series.unstack('년월')
+    .reindex(index=categories, columns=[int(m.replace('-', '')) for m in months])
+    .fillna(0)
+    .astype(int)
+)
+
+conc_data = dict(zip(categories, conc_mat.to_numpy().tolist()))
+for cat, conc in conc_data.items():
     print(f"{cat:20s}: 9월 {conc[0]:5d} | 10월 {conc[1]:5d} | 11월 {conc[2]:5d} | 12월 {conc[3]:5d}")
 
 # 4. 복합 바이럴 지수 계산
@@ -97,15 +95,12 @@ print("\n[4] 복합 바이럴 지수 (Viral Score)")
 print("    = 급등지수 정규화 × 0.5 + 점유율변화 정규화 × 0.5")
 print("-" * 70)
 
-viral_data = {}
-for cat in categories:
-    viral = []
-    for i in range(3):  # 10월, 11월, 12월
-        surge_norm = min(max(surge_data[cat][i] / 100, -1), 1)  # -100%~100% → -1~1
-        share_norm = min(max(share_data[cat][i] / 5, -1), 1)     # -5%p~5%p → -1~1
-        v = (surge_norm * 0.5 + share_norm * 0.5) * 100
-        viral.append(round(v, 1))
-    viral_data[cat] = viral
+surge_norm = np.clip(surge_mat / 100, -1, 1)  # -100%~100% → -1~1
+share_norm = np.clip(shift_mat / 5, -1, 1)     # -5%p~5%p → -1~1
+viral_mat = np.round((surge_norm * 0.5 + share_norm * 0.5) * 100, 1)
+
+viral_data = dict(zip(categories, viral_mat.tolist()))
+for cat, viral in viral_data.items():
     print(f"{cat:20s}: 10월 {viral[0]:+6.1f} | 11월 {viral[1]:+6.1f} | 12월 {viral[2]:+6.1f}")
 
 # 5. 베스트셀러 변화와 비교
@@ -115,30 +110,36 @@ print("=" * 70)
 
 print("\n[도서 수 변화]")
 print("-" * 70)
-book_change = {}
-for cat in categories:
-    bs_vals = [bs_monthly.loc[m, cat] if cat in bs_monthly.columns and m in bs_monthly.index else 0 for m in months]
-    changes = []
-    for i in range(1, len(bs_vals)):
-        changes.append(bs_vals[i] - bs_vals[i-1])
-    book_change[cat] = changes
+# 카테고리 × 월 베스트셀러 도서 수 (없는 카테고리/월은 0)
+bs_mat = bs_monthly.reindex(index=months, columns=categories, fill_value=0).T.to_numpy()
+book_change_mat = np.diff(bs_mat, axis=1)
+
+book_change = dict(zip(categories, book_change_mat.tolist()))
+for cat, bs_vals, changes in zip(categories, bs_mat.tolist(), book_change_mat.tolist()):
     print(f"{cat:20s}: 도서 {bs_vals} → 변화 {changes}")
 
 # 6. 상관관계 분석 (바이럴 지수 vs 도서 변화)
 print("\n[바이럴 지수 vs 도서 수 변화 상관관계]")
 print("-" * 70)
 
-results = []
-for cat in categories:
-    viral = viral_data[cat]
-    book_ch = book_change[cat]
+# 전체 카테고리의 Pearson r을 한 번에 계산
+n_points = viral_mat.shape[1]
+viral_c = viral_mat - viral_mat.mean(axis=1, keepdims=True)
+book_c = book_change_mat - book_change_mat.mean(axis=1, keepdims=True)
+with np.errstate(divide='ignore', invalid='ignore'):
+    corr_arr = (viral_c * book_c).sum(axis=1) / np.sqrt((viral_c ** 2).sum(axis=1) * (book_c ** 2).sum(axis=1))
+    corr_arr = np.clip(corr_arr, -1, 1)
+    t_arr = corr_arr * np.sqrt((n_points - 2) / (1 - corr_arr ** 2))
+pval_arr = 2 * stats.t.sf(np.abs(t_arr), n_points - 2)
+has_change = np.abs(book_change_mat).sum(axis=1) > 0  # 변화가 있는 경우만
 
-    if sum([abs(x) for x in book_ch]) > 0:  # 변화가 있는 경우만
-        corr, pval = stats.pearsonr(viral, book_ch)
+results = []
+for cat, corr, pval, changed in zip(categories, corr_arr, pval_arr, has_change):
+    if changed:
         results.append({
             '카테고리': cat,
-            '바이럴': viral,
-            '도서변화': book_ch,
+            '바이럴': viral_data[cat],
+            '도서변화': book_change[cat],
             '상관계수': round(corr, 3),
             'p-value': round(pval, 3)
         })
@@ -70,6 +70,12 @@ CATEGORY_KEYWORDS = {
     ]
 }
 
+# 소문자로 정규화한 카테고리 키워드 (모듈 로드 시 한 번만 변환)
+CATEGORY_KEYWORDS_LC = {
+    category: [kw.lower() for kw in keywords]
+    for category, keywords in CATEGORY_KEYWORDS.items()
+}
+
 
 def categorize_news(text):
     """텍스트를 분석하여 가장 연관성 높은 카테고리 반환"""
@@ -79,9 +85,9 @@ def categorize_news(text):
     text_lower = text.lower()
     category_scores = Counter()
 
-    for category, keywords in CATEGORY_KEYWORDS.items():
+    for category, keywords in CATEGORY_KEYWORDS_LC.items():
         for kw in keywords:
-            if kw.lower() in text_lower:
+            if kw in text_lower:
                 category_scores[category] += 1
 
     if category_scores:
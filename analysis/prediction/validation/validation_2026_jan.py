@@ -77,6 +77,12 @@ CATEGORY_KEYWORDS = {
     ]
 }
 
+# 소문자로 정규화한 카테고리 키워드 (모듈 로드 시 한 번만 변환)
+CATEGORY_KEYWORDS_LC = {
+    cat: [kw.lower() for kw in keywords]
+    for cat, keywords in CATEGORY_KEYWORDS.items()
+}
+
 # 카테고리명 -> 피처명 매핑
 CAT_TO_FEATURE = {
     "거시경제/금융정책": "macro_economy",
@@ -99,9 +105,9 @@ def categorize_news(text):
         return "미분류"
     text_lower = text.lower()
     scores = Counter()
-    for cat, keywords in CATEGORY_KEYWORDS.items():
+    for cat, keywords in CATEGORY_KEYWORDS_LC.items():
         for kw in keywords:
-            if kw.lower() in text_lower:
+            if kw in text_lower:
                 scores[cat] += 1
     return scores.most_common(1)[0][0] if scores else "미분류"
 
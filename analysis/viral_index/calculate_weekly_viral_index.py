@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 주간 뉴스 바이럴 지수 계산 스크립트 (DB 베스트셀러 주차 기준)
-1. DB(Supabase)에서 모든 뉴스 데이터를 가져옴
+1. DB(Supabase)에서 일자 x 카테고리별 뉴스 기사 수 집계 뷰를 가져옴
 2. DB의 'weekly_bestsellers' 테이블에서 주차 정의를 가져옴 (ymw, bestseller_week)
 3. 각 베스트셀러 주차 구간에 맞춰 뉴스 기사 수를 집계
 4. WoW, MA4 편차, Z-Score를 결합하여 바이럴 지수 및 Smoothing 지수 산출
@@ -13,6 +13,7 @@ import os
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -31,60 +32,115 @@ except ImportError:
     SUPABASE_ENABLED = False
     print("[오류] supabase 라이브러리가 설치되지 않았습니다.")
 
-def fetch_news_data_from_db():
+NEWS_TABLE_NAME = "news_2025_categorized"
+NEWS_DAILY_VIEW_NAME = "news_2025_daily_category_counts"
+
+
+def generate_daily_counts_view_sql():
+    """일자 x 카테고리 기사 수 집계 뷰 생성을 위한 SQL 쿼리 생성"""
+    sql = f"""
+CREATE OR REPLACE VIEW {NEWS_DAILY_VIEW_NAME} AS
+SELECT news_date, category, COUNT(*) AS article_count
+FROM {NEWS_TABLE_NAME}
+GROUP BY news_date, category;
+"""
+    return sql
+
+
+def fetch_news_data_from_db(page_size=1000, max_workers=8):
     if not SUPABASE_ENABLED:
         return None
     
-    print("📂 DB에서 뉴스 데이터를 불러오는 중...")
-    table_name = "news_2025_categorized"
-    all_data = []
-    page_size = 1000
-    offset = 0
+    print("📂 DB에서 일자별 뉴스 기사 수 집계를 불러오는 중...")
+    # 기사 원본 대신 DB에서 미리 집계된 (일자, 카테고리, 기사 수)만 전송받음
+    view_name = NEWS_DAILY_VIEW_NAME
+    
+    def fetch_page(offset):
+        # 병렬 요청 간 페이지가 겹치지 않도록 (일자, 카테고리) 순으로 고정
+        res = (
+            supabase.table(view_name)
+            .select('news_date, category, article_count')
+            .order('news_date')
+            .order('category')
+            .range(offset, offset + page_size - 1)
+            .execute()
+        )
+        return res.data or []
     
     try:
-        while True:
-            res = supabase.table(table_name).select('news_date, category').range(offset, offset + page_size - 1).execute()
-            data = res.data
-            if not data:
-                break
-            all_data.extend(data)
-            offset += page_size
-            if len(data) < page_size:
-                break
-            print(f"  >> 로딩 중... ({len(all_data):,}개)", end="\r")
+        # 전체 행 수를 먼저 조회한 뒤 모든 페이지를 동시에 요청
+        total = supabase.table(view_name).select('news_date', count='exact').limit(1).execute().count or 0
+        offsets = range(0, total, page_size)
+        print(f"  >> 총 {total:,}개 집계 행, {len(offsets)}개 페이지 병렬 로딩 중...")
         
-        df = pd.DataFrame(all_data)
-        if df.empty:
+        # 페이지별 dict 리스트를 누적하지 않고 컬럼 단위 리스트로 바로 적재
+        dates = []
+        categories = []
+        article_counts = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for data in executor.map(fetch_page, offsets):
+                dates.extend(row['news_date'] for row in data)
+                categories.extend(row['category'] for row in data)
+                article_counts.extend(row['article_count'] for row in data)
+        
+        if not dates:
             print("\n  >> 불러온 데이터가 없습니다.")
             return None
         
-        df = df.rename(columns={'news_date': 'date'})
-        df['date'] = pd.to_datetime(df['date'])
-        print(f"\n  >> 로드 완료: {len(df):,}개 기사")
+        # news_date는 DATE 컬럼(YYYY-MM-DD)이므로 고정 포맷으로 파싱
+        df = pd.DataFrame({
+            'date': pd.to_datetime(dates, format='%Y-%m-%d', cache=True),
+            'category': pd.Categorical(categories),
+            'article_count': np.asarray(article_counts, dtype=np.int64),
+        })
+        print(f"\n  >> 로드 완료: {df['article_count'].sum():,}개 기사 ({len(df):,}개 집계 행)")
         return df
     except Exception as e:
-        print(f"\n  >> DB 로드 중 오류 발생: {e}")
+        error_msg = str(e)
+        if "does not exist" in error_msg or "Could not find" in error_msg:
+            print(f"\n  >> '{view_name}' 뷰가 존재하지 않습니다.")
+            print("Supabase SQL Editor에서 아래 SQL을 실행하여 뷰를 먼저 생성해주세요:")
+            print(generate_daily_counts_view_sql())
+        else:
+            print(f"\n  >> DB 로드 중 오류 발생: {e}")
         return None
 
 def calculate_viral_indices(weekly_counts_df):
     print("\n📊 주간 바이럴 지수 및 Smoothing 지수 산출 중...")
     
     # 지수 구성 요소 계산 (안정성 강화)
-    prev_counts = weekly_counts_df.shift(1)
-    wow_growth = ((weekly_counts_df - prev_counts) / (prev_counts + 1)) * 100
-    
-    ma4 = weekly_counts_df.rolling(window=4, min_periods=1).mean()
-    ma_deviation = ((weekly_counts_df - ma4) / (ma4 + 1)) * 100
-    
-    z_scores = (weekly_counts_df - weekly_counts_df.mean()) / (weekly_counts_df.std() + 1e-9)
-    
-    viral_index = (
-        wow_growth.clip(upper=300).fillna(0) * 0.4 +
-        ma_deviation.clip(upper=300).fillna(0) * 0.4 +
-        z_scores.clip(lower=-3, upper=3).fillna(0) * 10 * 0.2
+    # 중간 DataFrame 생성 없이 ndarray 위에서 한 번에 계산
+    counts = weekly_counts_df.to_numpy(dtype=np.float64)
+    
+    # WoW 증가율 (첫 주는 전주가 없으므로 0)
+    wow_growth = np.zeros_like(counts)
+    wow_growth[1:] = (counts[1:] - counts[:-1]) / (counts[:-1] + 1) * 100
+    
+    # 4주 이동평균 대비 편차 (min_periods=1 → 앞쪽은 가용한 주만 평균)
+    # 누적합 차분으로 창 합계를 한 번에 계산 (기사 수는 정수라 오차 없음)
+    csum = np.vstack([np.zeros((1, counts.shape[1])), np.cumsum(counts, axis=0)])
+    rows = np.arange(1, len(counts) + 1)
+    window_len = np.minimum(rows, 4)
+    ma4 = (csum[rows] - csum[rows - window_len]) / window_len[:, None]
+    ma_deviation = (counts - ma4) / (ma4 + 1) * 100
+    
+    # Z-Score (표본 표준편차, 주차가 1개면 0 처리)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_scores = (counts - counts.mean(axis=0)) / (counts.std(axis=0, ddof=1) + 1e-9)
+    z_scores = np.nan_to_num(z_scores, nan=0.0)
+    
+    viral = (
+        np.minimum(wow_growth, 300) * 0.4 +
+        np.minimum(ma_deviation, 300) * 0.4 +
+        np.clip(z_scores, -3, 3) * 10 * 0.2
     )
     
-    viral_index_smoothed = viral_index.rolling(window=2, min_periods=1).mean()
+    # 2주 이동평균 Smoothing
+    viral_smoothed = viral.copy()
+    viral_smoothed[1:] = (viral[1:] + viral[:-1]) / 2
+    
+    viral_index = pd.DataFrame(viral, index=weekly_counts_df.index, columns=weekly_counts_df.columns)
+    viral_index_smoothed = pd.DataFrame(viral_smoothed, index=weekly_counts_df.index, columns=weekly_counts_df.columns)
     
     print(f"  >> 계산 완료: {len(weekly_counts_df)}개 주차 x {len(weekly_counts_df.columns)}개 카테고리")
     return viral_index, viral_index_smoothed
@@ -103,11 +159,10 @@ def main():
         res_bs_weeks = supabase.table('weekly_bestsellers').select('ymw, bestseller_week').order('ymw').execute()
         df_bs_weeks_raw = pd.DataFrame(res_bs_weeks.data).drop_duplicates()
         
-        def parse_week_string(week_str):
-            parts = week_str.split(' ~ ')
-            return pd.to_datetime(parts[0]), pd.to_datetime(parts[1])
-        
-        df_bs_weeks_raw[['start_date', 'end_date']] = df_bs_weeks_raw['bestseller_week'].apply(lambda x: pd.Series(parse_week_string(x)))
+        # 'YYYY.MM.DD ~ YYYY.MM.DD' 문자열을 컬럼 단위로 분리 후 일괄 파싱
+        week_bounds = df_bs_weeks_raw['bestseller_week'].str.split(' ~ ', n=1, expand=True)
+        df_bs_weeks_raw['start_date'] = pd.to_datetime(week_bounds[0].str.strip(), format='%Y.%m.%d')
+        df_bs_weeks_raw['end_date'] = pd.to_datetime(week_bounds[1].str.strip(), format='%Y.%m.%d')
         df_bs_weeks = df_bs_weeks_raw.sort_values('start_date').reset_index(drop=True)
 
         if df_bs_weeks.empty:
@@ -119,57 +174,52 @@ def main():
         print(f"  >> 베스트셀러 주차 정보 로드 중 오류 발생: {e}")
         return
 
-    all_weekly_news_counts = []
-    all_category_names = news_df['category'].unique()
+    # category는 Categorical이므로 문자열 해싱 없이 정수 코드로 집계
+    category_codes = news_df['category'].cat.codes.to_numpy()
+    category_labels = news_df['category'].cat.categories
+    # 카테고리 컬럼 순서는 데이터 등장 순서 유지
+    code_order = pd.unique(category_codes[category_codes >= 0])
+    all_category_names = np.asarray(category_labels[code_order])
     
     print("\n📊 각 DB 주차별 뉴스 기사 수 집계 중...")
-    for idx, row in df_bs_weeks.iterrows():
-        ymw_bs = row['ymw']
-        bestseller_week_str = row['bestseller_week']
-        start_date_bs = row['start_date']
-        end_date_bs = row['end_date']
-        
-        # 해당 베스트셀러 주차 구간에 해당하는 뉴스만 필터링
-        week_news_df = news_df[(news_df['date'] >= start_date_bs) & (news_df['date'] <= end_date_bs)]
-        
-        # 카테고리별 기사 수 집계 (모든 카테고리 포함)
-        counts_series = week_news_df['category'].value_counts().reindex(all_category_names, fill_value=0)
-        
-        for category, count in counts_series.items():
-            all_weekly_news_counts.append({
-                'ymw': ymw_bs,
-                'bestseller_week': bestseller_week_str,
-                'category': category,
-                'article_count': count,
-                'start_date': start_date_bs,
-                'end_date': end_date_bs
-            })
-    
-    df_news_counts_long = pd.DataFrame(all_weekly_news_counts)
-    
-    if df_news_counts_long.empty:
+    # 날짜를 일(day) 단위 정수로 바꿔 주차 시작일 배열에서 이진 탐색으로 소속 주차를 구함
+    # (주차 구간은 서로 겹치지 않고 start_date 순으로 정렬되어 있음)
+    start_days = df_bs_weeks['start_date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    end_days = df_bs_weeks['end_date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    news_days = news_df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    week_pos = np.searchsorted(start_days, news_days, side='right') - 1
+    in_week = week_pos >= 0
+    in_week[in_week] = news_days[in_week] <= end_days[week_pos[in_week]]
+    week_pos = np.where(in_week, week_pos, -1)
+    valid = in_week & (category_codes >= 0)
+    
+    # (주차, 카테고리 코드) 쌍을 평탄화한 인덱스로 기사 수 합산 (기사가 없는 칸은 0)
+    n_weeks = len(df_bs_weeks)
+    n_labels = len(category_labels)
+    flat_idx = week_pos[valid] * n_labels + category_codes[valid]
+    counts = np.bincount(
+        flat_idx,
+        weights=news_df['article_count'].to_numpy()[valid],
+        minlength=n_weeks * n_labels,
+    ).reshape(n_weeks, n_labels)[:, code_order]
+    weekly_counts = pd.DataFrame(counts.astype(np.int64), columns=all_category_names)
+    
+    if weekly_counts.empty:
         print("  >> 집계된 뉴스 데이터가 없습니다.")
         return
 
-    # 바이럴 지수 계산을 위해 wide format으로 변환
-    df_pivoted_counts = df_news_counts_long.pivot_table(index='ymw', columns='category', values='article_count', fill_value=0)
-    df_pivoted_counts.index = df_pivoted_counts.index.astype(str) # ensure ymw is string
-
-    # 바이럴 지수 계산 함수 호출
-    viral_index_df, viral_index_smoothed_df = calculate_viral_indices(df_pivoted_counts)
-
-    # 결과를 다시 long format으로 병합
-    viral_long = viral_index_df.stack().reset_index()
-    viral_long.columns = ['ymw', 'category', 'viral_index']
-    
-    viral_smoothed_long = viral_index_smoothed_df.stack().reset_index()
-    viral_smoothed_long.columns = ['ymw', 'category', 'viral_index_smoothed']
-    
-    result_df = pd.merge(df_news_counts_long, viral_long, on=['ymw', 'category'], how='left')
-    result_df = pd.merge(result_df, viral_smoothed_long, on=['ymw', 'category'], how='left')
+    # 바이럴 지수 계산 (행: ymw 주차 순, 열: 카테고리)
+    weekly_counts.index = pd.Index(df_bs_weeks['ymw'].astype(str), name='ymw')
+    viral_index_df, viral_index_smoothed_df = calculate_viral_indices(weekly_counts)
 
-    # 최종 컬럼 순서 조정
-    result_df = result_df[['ymw', 'bestseller_week', 'category', 'viral_index', 'viral_index_smoothed', 'article_count', 'start_date', 'end_date']]
+    # wide 결과를 그대로 펼쳐 long format 구성
+    # (세 프레임 모두 같은 주차 x 카테고리 순서이므로 merge 없이 위치 기준으로 결합)
+    n_cats = len(all_category_names)
+    result_df = df_bs_weeks.loc[df_bs_weeks.index.repeat(n_cats), ['ymw', 'bestseller_week', 'start_date', 'end_date']].reset_index(drop=True)
+    result_df.insert(2, 'category', np.tile(np.asarray(all_category_names), len(df_bs_weeks)))
+    result_df.insert(3, 'viral_index', viral_index_df.to_numpy().ravel())
+    result_df.insert(4, 'viral_index_smoothed', viral_index_smoothed_df.to_numpy().ravel())
+    result_df.insert(5, 'article_count', weekly_counts.to_numpy().ravel())
     
     output_dir = "/Users/minzzy/Desktop/statrack/book-review-analysis/analysis"
     if not os.path.exists(output_dir):
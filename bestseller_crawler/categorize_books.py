@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 """
 books 테이블의 keywords를 기반으로 카테고리 분류
+키워드로 분류되지 않는 도서는 제목 기반으로 한 번 더 추론 (단일 패스)
 연관성 순서대로 category_1, category_2, category_3에 저장
 """
 
 import os
+import re
 from dotenv import load_dotenv
 from collections import Counter
 
@@ -83,6 +85,60 @@ CATEGORY_KEYWORDS = {
     ]
 }
 
+# 소문자로 정규화한 카테고리 키워드 (모듈 로드 시 한 번만 변환)
+CATEGORY_KEYWORDS_LC = {
+    category: [kw.lower() for kw in cat_keywords]
+    for category, cat_keywords in CATEGORY_KEYWORDS.items()
+}
+
+# books 테이블 일괄 upsert 단위
+UPSERT_BATCH_SIZE = 500
+
+# 카테고리별 매처를 모듈 로드 시 한 번만 구성
+# - joined: 소문자 키워드를 구분자로 이어 붙인 문자열 (keyword in cat_kw 판정)
+# - pattern: 소문자 키워드 alternation 정규식 (cat_kw in keyword 판정)
+_MATCH_SEP = "\x00"
+CATEGORY_MATCHERS = {
+    category: (
+        _MATCH_SEP.join(cat_keywords),
+        re.compile("|".join(re.escape(kw) for kw in cat_keywords)),
+    )
+    for category, cat_keywords in CATEGORY_KEYWORDS_LC.items()
+}
+
+# 전체 카테고리 키워드를 합친 매처 (어느 카테고리와도 매칭되지 않는 도서를 빠르게 걸러냄)
+KEYWORD_SET = frozenset(kw for cat_keywords in CATEGORY_KEYWORDS_LC.values() for kw in cat_keywords)
+_ALL_KEYWORDS_JOINED = _MATCH_SEP.join(KEYWORD_SET)
+_ALL_KEYWORDS_PATTERN = re.compile("|".join(re.escape(kw) for kw in KEYWORD_SET))
+
+
+def _has_any_match(keywords: list) -> bool:
+    """키워드 중 하나라도 어떤 카테고리 키워드와 부분 매칭되는지 여부"""
+    return any(
+        keyword in KEYWORD_SET
+        or keyword in _ALL_KEYWORDS_JOINED
+        or _ALL_KEYWORDS_PATTERN.search(keyword)
+        for keyword in keywords
+    )
+
+
+def _match_categories(keyword: str) -> tuple:
+    """키워드와 부분 매칭되는 카테고리 목록 (CATEGORY_KEYWORDS 순서)"""
+    return tuple(
+        category for category, (joined, pattern) in CATEGORY_MATCHERS.items()
+        if keyword in joined or pattern.search(keyword)
+    )
+
+
+# 카테고리 키워드 → 매칭 카테고리 역색인
+# 도서 키워드는 대부분 사전 키워드와 정확히 일치하므로 dict 조회 한 번으로 처리
+KW_INDEX = {
+    kw: _match_categories(kw)
+    for cat_keywords in CATEGORY_KEYWORDS_LC.values()
+    for kw in cat_keywords
+}
+
+
 def categorize_book(keywords_str: str) -> list:
     """키워드 문자열을 분석하여 연관성 순으로 카테고리 반환 (최대 3개)"""
     if not keywords_str:
@@ -91,16 +147,20 @@ def categorize_book(keywords_str: str) -> list:
     # 키워드 분리 (쉼표 구분)
     keywords = [k.strip().lower() for k in keywords_str.split(',')]
 
+    # 매칭되는 키워드가 전혀 없으면 카테고리별 점수 계산 생략
+    if not _has_any_match(keywords):
+        return []
+
     # 각 카테고리별 매칭 점수 계산
     category_scores = Counter()
 
     for keyword in keywords:
-        for category, cat_keywords in CATEGORY_KEYWORDS.items():
-            # 키워드가 카테고리 키워드에 포함되는지 확인 (부분 매칭)
-            for cat_kw in cat_keywords:
-                if keyword in cat_kw.lower() or cat_kw.lower() in keyword:
-                    category_scores[category] += 1
-                    break
+        # 역색인에 없는 키워드만 카테고리별 부분 매칭 수행
+        matched = KW_INDEX.get(keyword)
+        if matched is None:
+            matched = _match_categories(keyword)
+        for category in matched:
+            category_scores[category] += 1
 
     # 점수가 1 이상인 카테고리만 선택, 점수 순 정렬
     ranked = [cat for cat, score in category_scores.most_common() if score >= 1]
@@ -109,6 +169,33 @@ def categorize_book(keywords_str: str) -> list:
     return ranked[:3]
 
 
+def categorize_by_title(title: str) -> list:
+    """제목을 분석하여 연관성 순으로 카테고리 반환"""
+    if not title:
+        return []
+
+    title_lower = title.lower()
+    category_scores = Counter()
+
+    for category, keywords in CATEGORY_KEYWORDS_LC.items():
+        for kw in keywords:
+            if kw in title_lower:
+                # 키워드 길이에 비례한 가중치 (더 구체적인 키워드일수록 높은 점수)
+                category_scores[category] += len(kw)
+
+    # 점수가 있는 카테고리만 선택
+    ranked = [cat for cat, score in category_scores.most_common() if score >= 1]
+    return ranked[:3]
+
+
+def flush_category_updates(pending: list):
+    """누적된 카테고리 업데이트를 books 테이블에 한 번에 upsert"""
+    if not pending:
+        return
+    supabase.table('books').upsert(pending, on_conflict='product_code').execute()
+    pending.clear()
+
+
 def main():
     print("=" * 60)
     print("[도서 카테고리 분류]")
@@ -126,24 +213,25 @@ def main():
 
     categorized_count = 0
     no_category_count = 0
+    pending = []
 
     for idx, book in enumerate(books, 1):
         product_code = book['product_code']
         title = book['title'] or ""
         keywords = book['keywords'] or ""
 
-        # 카테고리 분류 (키워드 + 제목 활용)
-        categories = categorize_book(keywords + "," + title if keywords else title)
+        # 카테고리 분류 (키워드 + 제목 활용, 실패 시 제목 기반 추론으로 보완)
+        categories = categorize_book(keywords + "," + title if keywords else title) or categorize_by_title(title)
 
-        # 업데이트 데이터 준비
-        update_data = {
+        # 업데이트 데이터 누적 (UPSERT_BATCH_SIZE마다 일괄 반영)
+        pending.append({
+            'product_code': product_code,
             'category_1': categories[0] if len(categories) > 0 else None,
             'category_2': categories[1] if len(categories) > 1 else None,
             'category_3': categories[2] if len(categories) > 2 else None,
-        }
-
-        # Supabase 업데이트
-        supabase.table('books').update(update_data).eq('product_code', product_code).execute()
+        })
+        if len(pending) >= UPSERT_BATCH_SIZE:
+            flush_category_updates(pending)
 
         # 결과 출력
         cat_str = " > ".join(categories) if categories else "(없음)"
@@ -155,6 +243,9 @@ def main():
         else:
             no_category_count += 1
 
+    # 남은 업데이트 반영
+    flush_category_updates(pending)
+
     print("\n" + "=" * 60)
     print(f"[완료] 카테고리 분류됨: {categorized_count}개")
     print(f"       카테고리 없음: {no_category_count}개")
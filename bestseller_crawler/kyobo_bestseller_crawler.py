@@ -10,10 +10,11 @@
 import argparse
 import asyncio
 import calendar
-import pandas as pd
-from dataclasses import dataclass, asdict
+import csv
+import operator
+from dataclasses import dataclass
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 import re
 import sys
 import platform
@@ -48,14 +49,100 @@ if platform.system() == 'Windows':
         pass
 
 try:
-    from playwright.async_api import async_playwright, Page
+    from playwright.async_api import async_playwright, Page, TimeoutError as PlaywrightTimeoutError
 except ImportError:
     print("Playwright가 설치되어 있지 않습니다.")
     print("설치 명령어: pip install playwright && playwright install chromium")
     sys.exit(1)
 
+# 상세 페이지 동시 수집 수 (하나의 브라우저 context 안에서 페이지 풀로 운용)
+DETAIL_CONCURRENCY = 4
+# 목록 페이지를 동시에 처리할 월 수
+MONTH_CONCURRENCY = 3
+
+# 수집 중 books 테이블 중간 저장 기준 (개수 또는 대기 시간)
+WRITE_BATCH_SIZE = 50
+WRITE_FLUSH_SECONDS = 5
+
+# 브라우저 프로필 (persistent context) 및 실행 옵션
+BROWSER_PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.pw-profile')
+BROWSER_ARGS = [
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--blink-settings=imagesEnabled=false',
+]
+
+# 상세 페이지 파싱용 정규식 (책마다 재사용)
+PUBLISH_DATE_PATTERN = re.compile(r'\d{4}년 \d{1,2}월 \d{1,2}일')
+# 저자 박스: '저자 … · 번역자 번역 …' 형식에서 저자/번역자를 한 번에 추출
+AUTHOR_PATTERN = re.compile(r'(?P<author>[^·]*?)(?:저자[^·]*)?(?=·|\Z)(?:·(?P<translator>[^·]*?)번역)?')
+PRODUCT_CODE_PATTERN = re.compile(r'(S\d+)')
+
+# 상세 페이지 필드를 한 번의 page.evaluate로 수집하는 스크립트
+# (요소가 없으면 null, 텍스트 가공은 Python 쪽에서 처리)
+BOOK_DETAIL_JS = """
+() => {
+    const first = (selector, root = document) => root ? root.querySelector(selector) : null;
+    const text = (el) => el ? el.innerText : null;
+    const attr = (el, name) => el ? el.getAttribute(name) : null;
+    const publishInfo = first('div.prod_info_text.publish_date');
+    const reviewBox = first('div.prod_review_box');
+    return {
+        title: text(first('span.prod_title')),
+        author: text(first('div.prod_author_box')),
+        publisher: text(first('a.btn_publish_link', publishInfo)),
+        publish_info: text(publishInfo),
+        price: text(first('span.prod_price')),
+        isbn: attr(first('meta[property="books:isbn"]'), 'content'),
+        rating: text(first('span.review_score')),
+        review_count: text(first('span.val', reviewBox)),
+        description: text(first('span.prod_desc')),
+        intro_sections: Array.from(document.querySelectorAll('div.intro_bottom div.info_text'), el => el.innerText),
+        book_intro: text(first('div.book_intro div.info_text')),
+        keywords: Array.from(document.querySelectorAll('div.product_keyword_pick ul.tabs li.tab_item a span'), el => el.innerText),
+        image_url: attr(first('meta[property="og:image"]'), 'content'),
+    };
+}
+"""
+
+# 이미 DB에 있는 책은 평점/리뷰 수만 수집
+BOOK_STATS_JS = """
+() => {
+    const reviewBox = document.querySelector('div.prod_review_box');
+    const rating = document.querySelector('span.review_score');
+    const reviewVal = reviewBox ? reviewBox.querySelector('span.val') : null;
+    return {
+        rating: rating ? rating.innerText : null,
+        review_count: reviewVal ? reviewVal.innerText : null,
+    };
+}
+"""
+
+# books 테이블에서 재사용하는 컬럼
+KNOWN_BOOK_COLUMNS = 'product_code, isbn, title, author, translator, publisher, publish_date, price, description, intro_text, keywords, image_url'
+# books 테이블 조회 페이지 크기 (PostgREST max-rows 기본값)
+KNOWN_BOOKS_PAGE_SIZE = 1000
+
+# 셀렉터가 읽지 않는 리소스는 내려받지 않음
+# (스타일시트는 innerText/드롭다운 표시에 영향을 주므로 유지)
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+
+# 키워드 탭에서 제외할 텍스트
+BLOCKED_KEYWORDS = frozenset({'더보기'})
+# 목록 링크 중 제목이 아닌 링크 (새창보기 등)
+BLOCKED_TITLE_WORDS = ('새창보기',)
+
+
+async def block_heavy_resources(route):
+    """이미지/미디어/폰트 요청 차단"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BookInfo:
     """책 정보 데이터 클래스"""
     rank: int  # 순위
@@ -77,6 +164,17 @@ class BookInfo:
     bestseller_month: str  # 베스트셀러 월 (예: 2025-12)
 
 
+# CSV 컬럼 순서 및 행 추출기 (BookInfo 필드를 컬럼 순서대로 튜플로 꺼냄)
+CSV_COLUMNS = [
+    'bestseller_month', 'rank', 'title', 'author', 'translator',
+    'publisher', 'publish_date', 'price', 'isbn', 'product_code',
+    'rating', 'review_count', 'description', 'intro_text',
+    'keywords', 'image_url', 'product_url'
+]
+CSV_ROW_GETTER = operator.attrgetter(*CSV_COLUMNS)
+CSV_KEYWORDS_POS = CSV_COLUMNS.index('keywords')
+
+
 async def select_dropdown_option(page: Page, dropdown_selector: str, option_text: str, label: str) -> bool:
     """
     드롭다운에서 특정 옵션 선택
@@ -130,37 +228,43 @@ async def get_bestseller_list(page: Page, year: int, month: int) -> List[dict]:
     target_period = f"{year}.{month:02d}.01 ~ {year}.{month:02d}.{last_day:02d}"
     print(f"  >> 목표 기간: {target_period}")
 
-    try:
-        # 드롭다운 버튼 찾기
-        dropdown = await page.query_selector('div.w-\\[200px\\].cursor-pointer, div[class*="w-[200px]"][class*="cursor-pointer"]')
-        if dropdown:
-            await dropdown.click()
-            await asyncio.sleep(1)
-
-            # 옵션 목록에서 해당 기간 찾기
-            options = await page.query_selector_all('ul li')
-            found = False
-            for opt in options:
-                text = (await opt.inner_text()).strip()
-                if target_period in text:
-                    await opt.click()
-                    await asyncio.sleep(2)
-                    print(f"  >> 기간 선택 완료: {text}")
-                    found = True
-                    break
-
-            if not found:
-                print(f"  >> 목표 기간을 찾을 수 없음, 사용 가능한 옵션들:")
-                for opt in options[:5]:
-                    text = (await opt.inner_text()).strip()
-                    print(f"     - {text}")
-                # 드롭다운 닫기
-                await page.keyboard.press("Escape")
-
-    except Exception as e:
-        print(f"  >> 드롭다운 선택 오류: {e}")
+    today = date.today()
+    if (year, month) == (today.year, today.month):
+        # 페이지 기본 선택이 이번 달이므로 드롭다운 조작 생략
+        print("  >> 이번 달은 기본 선택 기간 사용")
+    else:
+        try:
+            # 드롭다운 버튼 찾기
+            dropdown = await page.query_selector('div.w-\\[200px\\].cursor-pointer, div[class*="w-[200px]"][class*="cursor-pointer"]')
+            if dropdown:
+                await dropdown.click()
+                # 페이지에 원래 있는 ul li(메뉴 등)가 아니라 목표 기간 옵션이 렌더링될 때까지 대기
+                try:
+                    await page.wait_for_selector(f'ul li:has-text("{target_period}")', timeout=5000)
+                except PlaywrightTimeoutError:
+                    pass  # 아래에서 사용 가능한 옵션 목록을 출력
+
+                # 옵션 목록에서 해당 기간 찾기 (옵션 텍스트는 한 번에 읽어 재사용)
+                options = await page.query_selector_all('ul li')
+                option_texts = await page.evaluate("els => els.map(e => e.innerText.trim())", options)
+                found = False
+                for opt, text in zip(options, option_texts):
+                    if target_period in text:
+                        await opt.click()
+                        await asyncio.sleep(2)  # 동적 콘텐츠 로딩 대기
+                        print(f"  >> 기간 선택 완료: {text}")
+                        found = True
+                        break
+
+                if not found:
+                    print(f"  >> 목표 기간을 찾을 수 없음, 사용 가능한 옵션들:")
+                    for text in option_texts[:5]:
+                        print(f"     - {text}")
+                    # 드롭다운 닫기
+                    await page.keyboard.press("Escape")
 
-    await asyncio.sleep(2)  # 동적 콘텐츠 로딩 대기
+        except Exception as e:
+            print(f"  >> 드롭다운 선택 오류: {e}")
 
     # 현재 페이지에서 선택된 기간 확인
     try:
@@ -173,90 +277,150 @@ async def get_bestseller_list(page: Page, year: int, month: int) -> List[dict]:
 
     books = []
     seen_urls = set()
+    rank_lines = []  # 순위 로그는 모아서 한 번에 출력
 
-    # prod_link 클래스를 가진 모든 상품 링크 찾기
-    all_links = await page.query_selector_all('a.prod_link[href*="/detail/"]')
+    # prod_link 클래스를 가진 모든 상품 링크의 href/제목을 한 번에 추출
+    all_links = await page.eval_on_selector_all(
+        'a.prod_link[href*="/detail/"]',
+        "els => els.map(e => ({href: e.getAttribute('href') || '', text: e.innerText.trim()}))"
+    )
 
     for link in all_links:
-        try:
-            url = await link.get_attribute('href') or ""
-            if not url or url in seen_urls:
-                continue
+        url = link['href']
+        if not url or url in seen_urls:
+            continue
 
-            # 제목 텍스트 추출
-            title = (await link.inner_text()).strip()
+        # 제목 텍스트
+        title = link['text']
 
-            # 유효한 제목 링크만 수집 (새창보기 등 제외)
-            if title and len(title) > 2 and "새창보기" not in title:
-                seen_urls.add(url)
-                rank = len(books) + 1
+        # 유효한 제목 링크만 수집 (새창보기 등 제외)
+        if title and len(title) > 2 and not any(word in title for word in BLOCKED_TITLE_WORDS):
+            seen_urls.add(url)
+            rank = len(books) + 1
 
-                if not url.startswith('http'):
-                    url = f"https://product.kyobobook.co.kr{url}"
+            if not url.startswith('http'):
+                url = f"https://product.kyobobook.co.kr{url}"
 
-                books.append({
-                    'rank': rank,
-                    'title': title,
-                    'product_url': url
-                })
-                print(f"  {rank}위: {title[:40]}...")
+            books.append({
+                'rank': rank,
+                'title': title,
+                'product_url': url
+            })
+            rank_lines.append(f"  {rank}위: {title[:40]}...")
 
-                if len(books) >= 20:
-                    break
-
-        except Exception as e:
-            print(f"  >> 링크 파싱 오류: {e}")
-            continue
+            if len(books) >= 20:
+                break
 
+    if rank_lines:
+        print("\n".join(rank_lines))
     print(f"  >> 총 {len(books)}개 책 목록 수집 완료")
     return books
 
 
+def parse_review_stats(raw: dict) -> tuple:
+    """
+    evaluate 결과에서 평점과 리뷰 수 파싱
+    """
+    rating = 0.0
+    if raw['rating'] is not None:
+        try:
+            rating = float(raw['rating'].strip())
+        except:
+            pass
+
+    review_count = 0
+    if raw['review_count'] is not None:
+        try:
+            review_count = int(raw['review_count'].strip())
+        except:
+            pass
+
+    return rating, review_count
+
+
+async def get_known_book_info(page: Page, product_url: str, rank: int, month_str: str, known: dict) -> Optional[BookInfo]:
+    """
+    DB에 이미 있는 책은 도서 정보를 재사용하고 평점/리뷰 수만 새로 수집
+    """
+    try:
+        await page.goto(product_url, wait_until="domcontentloaded", timeout=60000)
+        try:
+            # 리뷰가 없는 책에는 span.review_score 가 없으므로 항상 있는 제목 요소로 로딩 확인
+            await page.wait_for_selector('span.prod_title', state='attached', timeout=15000)
+        except PlaywrightTimeoutError:
+            pass
+
+        rating, review_count = parse_review_stats(await page.evaluate(BOOK_STATS_JS))
+
+        return BookInfo(
+            rank=rank,
+            title=known['title'],
+            author=known['author'] or "",
+            translator=known['translator'],
+            publisher=known['publisher'] or "",
+            publish_date=known['publish_date'] or "",
+            price=known['price'] or 0,
+            isbn=known['isbn'] or "",
+            product_code=known['product_code'],
+            rating=rating,
+            review_count=review_count,
+            description=known['description'] or "",
+            intro_text=known['intro_text'] or "",
+            keywords=known['keywords'].split(', ') if known['keywords'] else [],
+            image_url=known['image_url'] or "",
+            product_url=product_url,
+            bestseller_month=month_str
+        )
+
+    except Exception as e:
+        print(f"    >> 평점/리뷰 수집 오류: {e}")
+        return None
+
+
 async def get_book_detail(page: Page, product_url: str, rank: int, month_str: str) -> Optional[BookInfo]:
     """
     개별 책 상세 페이지에서 정보 추출
     """
     try:
         await page.goto(product_url, wait_until="domcontentloaded", timeout=60000)
-        await asyncio.sleep(3)  # 동적 콘텐츠 로딩 대기
+        # 제목 요소가 붙으면 바로 진행, 이후 남은 요청은 최대 5초까지만 대기
+        try:
+            await page.wait_for_selector('span.prod_title', state='attached', timeout=15000)
+            try:
+                await page.wait_for_load_state('networkidle', timeout=5000)
+            except PlaywrightTimeoutError:
+                pass
+        except PlaywrightTimeoutError:
+            await asyncio.sleep(3)  # 제목 대기 실패 시 고정 대기
+
+        # 상세 필드 일괄 추출
+        raw = await page.evaluate(BOOK_DETAIL_JS)
 
         # 제목
-        title_elem = await page.query_selector('span.prod_title')
-        title = ""
-        if title_elem:
-            title = (await title_elem.inner_text()).strip()
+        title = (raw['title'] or "").strip()
 
         # 저자 및 번역자
         author = ""
         translator = None
-        author_box = await page.query_selector('div.prod_author_box')
-        if author_box:
-            author_text = await author_box.inner_text()
-            parts = author_text.split('·')
-            if len(parts) >= 1:
-                author = parts[0].split('저자')[0].strip()
-            if len(parts) >= 2 and '번역' in parts[1]:
-                translator = parts[1].split('번역')[0].strip()
+        if raw['author'] is not None:
+            author_match = AUTHOR_PATTERN.match(raw['author'])
+            author = author_match.group('author').strip()
+            if author_match.group('translator') is not None:
+                translator = author_match.group('translator').strip()
 
         # 출판사 및 출판일
-        publisher = ""
+        publisher = (raw['publisher'] or "").strip()
         publish_date = ""
-        publish_info = await page.query_selector('div.prod_info_text.publish_date')
-        if publish_info:
-            pub_link = await publish_info.query_selector('a.btn_publish_link')
-            if pub_link:
-                publisher = (await pub_link.inner_text()).strip()
-
-            pub_text = await publish_info.inner_text()
-            date_match = re.search(r'\d{4}년 \d{1,2}월 \d{1,2}일', pub_text)
+        pub_text = raw['publish_info']
+        if pub_text is not None:
+            date_match = PUBLISH_DATE_PATTERN.search(pub_text)
             if date_match:
                 publish_date = date_match.group()
 
         # 가격
         price = 0
-        price_elem = await page.query_selector('span.prod_price')
-        if price_elem:
-            price_text = (await price_elem.inner_text()).strip()
+        if raw['price'] is not None:
+            price_text = raw['price'].strip()
             price_text = price_text.replace(',', '').replace('원', '')
             try:
                 price = int(price_text)
@@ -264,72 +428,43 @@ async def get_book_detail(page: Page, product_url: str, rank: int, month_str: st
                 pass
 
         # ISBN
-        isbn = ""
-        isbn_meta = await page.query_selector('meta[property="books:isbn"]')
-        if isbn_meta:
-            isbn = await isbn_meta.get_attribute('content') or ""
+        isbn = raw['isbn'] or ""
 
         # 상품코드 (S로 시작하는 코드) - URL에서 추출
         product_code = ""
-        code_match = re.search(r'(S\d+)', product_url)
+        code_match = PRODUCT_CODE_PATTERN.search(product_url)
         if code_match:
             product_code = code_match.group(1)
 
-        # 평점
-        rating = 0.0
-        rating_elem = await page.query_selector('span.review_score')
-        if rating_elem:
-            try:
-                rating = float((await rating_elem.inner_text()).strip())
-            except:
-                pass
-
-        # 리뷰 수
-        review_count = 0
-        review_box = await page.query_selector('div.prod_review_box')
-        if review_box:
-            review_val = await review_box.query_selector('span.val')
-            if review_val:
-                try:
-                    review_count = int((await review_val.inner_text()).strip())
-                except:
-                    pass
+        # 평점 및 리뷰 수
+        rating, review_count = parse_review_stats(raw)
 
         # 짧은 설명
-        description = ""
-        desc_elem = await page.query_selector('span.prod_desc')
-        if desc_elem:
-            description = (await desc_elem.inner_text()).strip()
+        description = (raw['description'] or "").strip()
 
         # 상세 소개글 (intro_bottom의 info_text)
         intro_text = ""
-        intro_sections = await page.query_selector_all('div.intro_bottom div.info_text')
-        for section in intro_sections:
-            text = (await section.inner_text()).strip()
+        for section_text in raw['intro_sections']:
+            text = section_text.strip()
             if text and len(text) > 50:  # 짧은 텍스트 제외
                 intro_text += text + "\n\n"
         intro_text = intro_text.strip()
 
         # 책 소개 본문도 수집
-        book_intro = await page.query_selector('div.book_intro div.info_text')
-        if book_intro:
-            book_intro_text = (await book_intro.inner_text()).strip()
+        if raw['book_intro'] is not None:
+            book_intro_text = raw['book_intro'].strip()
             if book_intro_text:
                 intro_text = book_intro_text + "\n\n" + intro_text
 
         # 키워드 리스트
         keywords = []
-        keyword_tabs = await page.query_selector_all('div.product_keyword_pick ul.tabs li.tab_item a span')
-        for kw in keyword_tabs:
-            kw_text = (await kw.inner_text()).strip()
-            if kw_text and kw_text != '더보기':
+        for kw in raw['keywords']:
+            kw_text = kw.strip()
+            if kw_text and kw_text not in BLOCKED_KEYWORDS:
                 keywords.append(kw_text)
 
         # 이미지 URL
-        image_url = ""
-        image_meta = await page.query_selector('meta[property="og:image"]')
-        if image_meta:
-            image_url = await image_meta.get_attribute('content') or ""
+        image_url = raw['image_url'] or ""
 
         return BookInfo(
             rank=rank,
@@ -356,80 +491,213 @@ async def get_book_detail(page: Page, product_url: str, rank: int, month_str: st
         return None
 
 
-async def crawl_bestsellers(year: int, months: List[int], top_n: int = 20) -> List[BookInfo]:
+async def detail_worker(page: Page, sq: asyncio.Queue, cq: asyncio.Queue, known_books: dict, results: dict):
     """
-    지정된 년도와 월들의 베스트셀러 크롤링
+    제출 큐(sq)에서 상세 수집 작업을 꺼내 처리하고, 결과를 완료 큐(cq)에 전달
+    - known_books에 있는 상품코드는 상세 수집을 건너뛰고 평점/리뷰 수만 수집
+    - None을 받으면 종료
     """
-    all_books = []
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080}
-        )
-        page = await context.new_page()
-
-        for month in months:
-            month_str = f"{year}-{month:02d}"
-            print(f"\n{'='*70}")
-            print(f"[{month_str}] 베스트셀러 크롤링 시작")
-            print('='*70)
-
-            # 베스트셀러 목록 수집
-            book_list = await get_bestseller_list(page, year, month)
+    while True:
+        job = await sq.get()
+        try:
+            if job is None:
+                return
 
-            # 각 책의 상세 정보 수집
-            for idx, book in enumerate(book_list[:top_n], 1):
-                print(f"\n[{idx}/{min(len(book_list), top_n)}] {book['title'][:40]}...")
+            order, month_str, idx, total, book = job
+            code_match = PRODUCT_CODE_PATTERN.search(book['product_url'])
+            known = known_books.get(code_match.group(1)) if code_match else None
 
+            if known:
+                book_info = await get_known_book_info(
+                    page,
+                    book['product_url'],
+                    book['rank'],
+                    month_str,
+                    known
+                )
+            else:
                 book_info = await get_book_detail(
                     page,
                     book['product_url'],
                     book['rank'],
                     month_str
                 )
+            await asyncio.sleep(1)  # 서버 부하 방지
 
-                if book_info:
-                    all_books.append(book_info)
-                    print(f"    >> 수집 완료: {book_info.title[:30]}...")
-                else:
-                    print(f"    >> 수집 실패")
+            # 책 단위 로그는 한 번에 출력 (동시 수집 시 줄이 섞이지 않도록)
+            header = f"\n[{month_str} {idx}/{total}] {book['title'][:40]}..."
+            if book_info:
+                results[order] = book_info
+                await cq.put(book_info)
+                print(f"{header}\n    >> 수집 완료: {book_info.title[:30]}...")
+            else:
+                print(f"{header}\n    >> 수집 실패")
+        finally:
+            sq.task_done()
 
-                await asyncio.sleep(1)  # 서버 부하 방지
 
-        await browser.close()
+async def book_writer(cq: asyncio.Queue, saved_codes: set, csv_file=None):
+    """
+    완료 큐(cq)의 BookInfo를 CSV에 바로 기록하고, books 테이블에는 모아서 배치 upsert
+    - WRITE_BATCH_SIZE개가 모이거나 WRITE_FLUSH_SECONDS 동안 새 결과가 없으면 저장 (CSV도 이때 디스크 반영)
+    - None을 받으면 남은 데이터를 저장하고 종료
+    """
+    csv_writer = csv.writer(csv_file) if csv_file else None
+    pending = {}
+    unflushed = 0
+    finished = False
 
-    return all_books
+    while not finished:
+        try:
+            book_info = await asyncio.wait_for(cq.get(), timeout=WRITE_FLUSH_SECONDS)
+            if book_info is None:
+                finished = True
+            else:
+                if csv_writer:
+                    csv_writer.writerow(book_to_csv_row(book_info))
+                    unflushed += 1
+                if book_info.product_code and book_info.product_code not in saved_codes:
+                    pending.setdefault(book_info.product_code, book_to_row(book_info))
+            if not finished and len(pending) < WRITE_BATCH_SIZE and unflushed < WRITE_BATCH_SIZE:
+                continue
+        except asyncio.TimeoutError:
+            pass
+
+        if csv_writer and unflushed:
+            csv_file.flush()
+            os.fsync(csv_file.fileno())
+            unflushed = 0
+
+        if pending and SUPABASE_ENABLED:
+            rows = list(pending.values())
+            try:
+                await asyncio.to_thread(
+                    lambda: supabase.table('books').upsert(rows, on_conflict='product_code').execute()
+                )
+                saved_codes.update(pending)
+                print(f"[Supabase] books 테이블: {len(rows)}개 도서 정보 중간 저장")
+            except Exception as e:
+                print(f"[Supabase 중간 저장 오류] {e}")
+        pending = {}
 
 
-def save_to_csv(books: List[BookInfo], filename: str):
+async def crawl_month(list_pool: asyncio.Queue, sq: asyncio.Queue, year: int, month: int, month_pos: int, top_n: int):
     """
-    BookInfo 리스트를 CSV 파일로 저장
+    한 달치 베스트셀러 목록을 수집해 상세 수집 작업을 제출 큐(sq)에 넣음
     """
-    data = []
-    for book in books:
-        row = asdict(book)
-        # 키워드 리스트를 문자열로 변환
-        row['keywords'] = ', '.join(book.keywords)
-        data.append(row)
+    month_str = f"{year}-{month:02d}"
+
+    # 베스트셀러 목록 수집 (목록 페이지 풀에서 하나를 빌려 사용)
+    page = await list_pool.get()
+    try:
+        print(f"\n{'='*70}")
+        print(f"[{month_str}] 베스트셀러 크롤링 시작")
+        print('='*70)
+        book_list = await get_bestseller_list(page, year, month)
+    finally:
+        list_pool.put_nowait(page)
 
-    df = pd.DataFrame(data)
+    # 각 책의 상세 정보 수집 작업 제출
+    targets = book_list[:top_n]
+    for idx, book in enumerate(targets, 1):
+        await sq.put(((month_pos, idx), month_str, idx, len(targets), book))
 
-    # 컬럼 순서 정리
-    columns = [
-        'bestseller_month', 'rank', 'title', 'author', 'translator',
-        'publisher', 'publish_date', 'price', 'isbn', 'product_code',
-        'rating', 'review_count', 'description', 'intro_text',
-        'keywords', 'image_url', 'product_url'
-    ]
-    df = df[columns]
 
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"\n[CSV 저장 완료] {filename}")
-    print(f"총 {len(df)}개 책 정보 저장")
+async def crawl_bestsellers(year: int, months: List[int], top_n: int = 20, known_books: Optional[dict] = None, saved_codes: Optional[set] = None, csv_file=None) -> List[BookInfo]:
+    """
+    지정된 년도와 월들의 베스트셀러 크롤링
+    - 목록 수집(월 단위 동시) → 상세 수집(워커) → CSV 기록/books 중간 저장(writer)을 큐로 연결
+    - 반환 결과는 월/순위 순서 유지 (CSV는 수집 완료 순서), 중간 저장된 상품코드는 saved_codes에 기록
+    """
+    known_books = known_books or {}
+    saved_codes = saved_codes if saved_codes is not None else set()
+    results = {}
+
+    async with async_playwright() as p:
+        # 프로필 디렉터리를 재사용해 실행 간 HTTP 캐시를 유지
+        context = await p.chromium.launch_persistent_context(
+            BROWSER_PROFILE_DIR,
+            headless=True,
+            args=BROWSER_ARGS,
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            viewport={'width': 1920, 'height': 1080}
+        )
+        await context.route("**/*", block_heavy_resources)
+
+        # 목록 페이지 풀 (persistent context가 처음 연 페이지도 재사용)
+        list_pool = asyncio.Queue()
+        for page in context.pages[:MONTH_CONCURRENCY]:
+            list_pool.put_nowait(page)
+        while list_pool.qsize() < MONTH_CONCURRENCY:
+            list_pool.put_nowait(await context.new_page())
+
+        # 제출 큐(sq) → 상세 수집 워커 → 완료 큐(cq) → writer
+        sq = asyncio.Queue()
+        cq = asyncio.Queue()
+        workers = []
+        for _ in range(DETAIL_CONCURRENCY):
+            page = await context.new_page()
+            workers.append(asyncio.create_task(detail_worker(page, sq, cq, known_books, results)))
+        writer = asyncio.create_task(book_writer(cq, saved_codes, csv_file))
+
+        await asyncio.gather(
+            *(crawl_month(list_pool, sq, year, month, month_pos, top_n) for month_pos, month in enumerate(months))
+        )
+
+        # 남은 작업 처리 후 워커/writer 순서로 종료
+        await sq.join()
+        for _ in workers:
+            sq.put_nowait(None)
+        await asyncio.gather(*workers)
+        cq.put_nowait(None)
+        await writer
+
+        await context.close()
+
+    return [results[order] for order in sorted(results)]
+
+
+def book_to_csv_row(book: BookInfo) -> list:
+    """
+    BookInfo를 CSV_COLUMNS 순서의 행으로 변환
+    """
+    row = list(CSV_ROW_GETTER(book))
+    # 키워드 리스트를 문자열로 변환
+    row[CSV_KEYWORDS_POS] = ', '.join(book.keywords)
+    return row
+
+
+def open_csv(filename: str):
+    """
+    CSV 파일을 열고 헤더를 기록 (이후 수집되는 대로 행을 이어서 기록)
+    """
+    f = open(filename, 'w', encoding='utf-8-sig', newline='')
+    csv.writer(f).writerow(CSV_COLUMNS)
+    return f
 
-    return df
+
+def load_known_books() -> dict:
+    """
+    books 테이블에서 제목이 채워진 도서를 상품코드 기준으로 로드
+    """
+    if not SUPABASE_ENABLED:
+        return {}
+
+    try:
+        # PostgREST 기본 최대 1000행 제한이 있으므로 product_code 순으로 페이지 단위 조회
+        known_books = {}
+        start = 0
+        while True:
+            res = supabase.table('books').select(KNOWN_BOOK_COLUMNS).neq('title', '').order('product_code').range(start, start + KNOWN_BOOKS_PAGE_SIZE - 1).execute()
+            known_books.update((row['product_code'], row) for row in res.data)
+            if len(res.data) < KNOWN_BOOKS_PAGE_SIZE:
+                break
+            start += KNOWN_BOOKS_PAGE_SIZE
+        print(f"[Supabase] 기존 도서 {len(known_books)}개 - 상세 수집 생략")
+        return known_books
+    except Exception as e:
+        print(f"[Supabase 조회 오류] {e}")
+        return {}
 
 
 def clear_supabase_data():
@@ -460,36 +728,45 @@ def clear_supabase_data():
         return False
 
 
-def save_to_supabase(books: List[BookInfo]):
+def book_to_row(book: BookInfo) -> dict:
+    """
+    BookInfo를 books 테이블 행으로 변환
+    """
+    return {
+        'product_code': book.product_code,
+        'isbn': book.isbn,
+        'title': book.title,
+        'author': book.author,
+        'translator': book.translator,
+        'publisher': book.publisher,
+        'publish_date': book.publish_date,
+        'price': book.price,
+        'description': book.description,
+        'intro_text': book.intro_text[:2000] if book.intro_text else "",
+        'keywords': ', '.join(book.keywords),
+        'image_url': book.image_url,
+        'product_url': book.product_url
+    }
+
+
+def save_to_supabase(books: List[BookInfo], saved_codes: Optional[set] = None):
     """
     BookInfo 리스트를 Supabase에 정규화하여 저장
-    - books 테이블: 도서 마스터 (중복 제거)
+    - books 테이블: 도서 마스터 (중복 제거, 수집 중 이미 저장된 상품코드는 제외)
     - bestsellers 테이블: 기간별 베스트셀러 순위 기록
     """
     if not SUPABASE_ENABLED:
         print("[Supabase] 비활성화 상태 - 저장 건너뜀")
         return False
 
+    saved_codes = saved_codes or set()
+
     try:
         # 1. 도서 마스터 테이블 데이터 준비 (중복 제거)
         books_data = {}
         for book in books:
-            if book.product_code and book.product_code not in books_data:
-                books_data[book.product_code] = {
-                    'product_code': book.product_code,
-                    'isbn': book.isbn,
-                    'title': book.title,
-                    'author': book.author,
-                    'translator': book.translator,
-                    'publisher': book.publisher,
-                    'publish_date': book.publish_date,
-                    'price': book.price,
-                    'description': book.description,
-                    'intro_text': book.intro_text[:2000] if book.intro_text else "",
-                    'keywords': ', '.join(book.keywords),
-                    'image_url': book.image_url,
-                    'product_url': book.product_url
-                }
+            if book.product_code and book.product_code not in books_data and book.product_code not in saved_codes:
+                books_data[book.product_code] = book_to_row(book)
 
         # 2. 베스트셀러 테이블 데이터 준비 (기간별 기록, 중복 허용)
         bestsellers_data = []
@@ -555,33 +832,41 @@ async def main():
         print("\n[경고] 기존 데이터 삭제 옵션이 활성화되었습니다.")
         clear_supabase_data()
 
-    # 크롤링 실행
-    books = await crawl_bestsellers(year, months, top_n=20)
+    # 이미 수집된 도서는 상세 수집 생략 (--clear 시에는 전체 수집)
+    known_books = {} if args.clear else load_known_books()
+
+    # CSV는 수집되는 대로 기록 (중간에 중단되어도 수집분 보존)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"kyobo_bestseller_{year}_all_{timestamp}.csv"
+
+    # 크롤링 실행 (books 테이블은 수집 중 배치로 중간 저장, 기존 도서는 저장 생략)
+    saved_codes = set(known_books)
+    with open_csv(filename) as csv_file:
+        books = await crawl_bestsellers(year, months, top_n=20, known_books=known_books, saved_codes=saved_codes, csv_file=csv_file)
 
     if not books:
+        os.remove(filename)
         print("\n[오류] 수집된 데이터가 없습니다.")
         return
 
-    # CSV 저장
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"kyobo_bestseller_{year}_all_{timestamp}.csv"
-    df = save_to_csv(books, filename)
+    print(f"\n[CSV 저장 완료] {filename}")
+    print(f"총 {len(books)}개 책 정보 저장")
 
     # Supabase 저장
-    save_to_supabase(books)
+    save_to_supabase(books, saved_codes)
 
     # 미리보기
     print("\n" + "="*70)
     print("[데이터 미리보기]")
     print("-"*70)
-    for idx, row in df.head(5).iterrows():
-        print(f"\n{row['rank']}위: {row['title']}")
-        print(f"   저자: {row['author']}")
-        print(f"   출판사: {row['publisher']} | 가격: {row['price']:,}원")
-        print(f"   ISBN: {row['isbn']} | 상품코드: {row['product_code']}")
-        print(f"   평점: {row['rating']} | 리뷰: {row['review_count']}개")
-        if row['keywords']:
-            print(f"   키워드: {row['keywords'][:50]}...")
+    for book in books[:5]:
+        print(f"\n{book.rank}위: {book.title}")
+        print(f"   저자: {book.author}")
+        print(f"   출판사: {book.publisher} | 가격: {book.price:,}원")
+        print(f"   ISBN: {book.isbn} | 상품코드: {book.product_code}")
+        print(f"   평점: {book.rating} | 리뷰: {book.review_count}개")
+        if book.keywords:
+            print(f"   키워드: {', '.join(book.keywords)[:50]}...")
 
     print("\n" + "="*70)
     print(f"CSV 파일: {filename}")
@@ -1,12 +1,11 @@
 #!/usr/bin/env python3
 """
 빈 데이터만 재크롤링하는 스크립트
-대기 시간을 5초로 늘려서 실행
+제목 요소 대기 후 실행 (실패 시 5초 대기)
 """
 
 import asyncio
 import pandas as pd
-import re
 import os
 from dotenv import load_dotenv
 
@@ -24,51 +23,68 @@ try:
 except ImportError:
     SUPABASE_ENABLED = False
 
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+# 상세 페이지 추출 스크립트/파싱 정규식/리소스 차단은 본 크롤러와 공유
+from kyobo_bestseller_crawler import (
+    AUTHOR_PATTERN,
+    BLOCKED_KEYWORDS,
+    BOOK_DETAIL_JS,
+    PUBLISH_DATE_PATTERN,
+    block_heavy_resources,
+)
+
+# 상세 페이지 동시 수집 수
+DETAIL_CONCURRENCY = 4
+
+# Supabase upsert 배치 크기
+UPSERT_BATCH_SIZE = 500
 
 
 async def get_book_detail(page, product_code: str) -> dict:
-    """개별 책 상세 페이지에서 정보 추출 (대기 시간 5초)"""
+    """개별 책 상세 페이지에서 정보 추출 (제목 요소 대기, 실패 시 5초)"""
     product_url = f"https://product.kyobobook.co.kr/detail/{product_code}"
 
     try:
         await page.goto(product_url, wait_until="domcontentloaded", timeout=60000)
-        await asyncio.sleep(5)  # 대기 시간 5초로 증가
+        # 제목 요소가 붙으면 바로 진행, 이후 남은 요청은 최대 5초까지만 대기
+        try:
+            await page.wait_for_selector('span.prod_title', state='attached', timeout=15000)
+            try:
+                await page.wait_for_load_state('networkidle', timeout=5000)
+            except PlaywrightTimeoutError:
+                pass
+        except PlaywrightTimeoutError:
+            await asyncio.sleep(5)  # 제목 대기 실패 시 고정 대기
+
+        # 상세 필드 일괄 추출
+        raw = await page.evaluate(BOOK_DETAIL_JS)
 
         # 제목
-        title_elem = await page.query_selector('span.prod_title')
-        title = (await title_elem.inner_text()).strip() if title_elem else ""
+        title = (raw['title'] or "").strip()
 
         # 저자 및 번역자
         author = ""
         translator = None
-        author_box = await page.query_selector('div.prod_author_box')
-        if author_box:
-            author_text = await author_box.inner_text()
-            parts = author_text.split('·')
-            if len(parts) >= 1:
-                author = parts[0].split('저자')[0].strip()
-            if len(parts) >= 2 and '번역' in parts[1]:
-                translator = parts[1].split('번역')[0].strip()
+        if raw['author'] is not None:
+            author_match = AUTHOR_PATTERN.match(raw['author'])
+            author = author_match.group('author').strip()
+            if author_match.group('translator') is not None:
+                translator = author_match.group('translator').strip()
 
         # 출판사 및 출판일
-        publisher = ""
+        publisher = (raw['publisher'] or "").strip()
         publish_date = ""
-        publish_info = await page.query_selector('div.prod_info_text.publish_date')
-        if publish_info:
-            pub_link = await publish_info.query_selector('a.btn_publish_link')
-            if pub_link:
-                publisher = (await pub_link.inner_text()).strip()
-            pub_text = await publish_info.inner_text()
-            date_match = re.search(r'\d{4}년 \d{1,2}월 \d{1,2}일', pub_text)
+        pub_text = raw['publish_info']
+        if pub_text is not None:
+            date_match = PUBLISH_DATE_PATTERN.search(pub_text)
             if date_match:
                 publish_date = date_match.group()
 
         # 가격
         price = 0
-        price_elem = await page.query_selector('span.prod_price')
-        if price_elem:
-            price_text = (await price_elem.inner_text()).strip()
+        if raw['price'] is not None:
+            price_text = raw['price'].strip()
             price_text = price_text.replace(',', '').replace('원', '')
             try:
                 price = int(price_text)
@@ -76,65 +92,49 @@ async def get_book_detail(page, product_code: str) -> dict:
                 pass
 
         # ISBN
-        isbn = ""
-        isbn_meta = await page.query_selector('meta[property="books:isbn"]')
-        if isbn_meta:
-            isbn = await isbn_meta.get_attribute('content') or ""
+        isbn = raw['isbn'] or ""
 
         # 평점
         rating = 0.0
-        rating_elem = await page.query_selector('span.review_score')
-        if rating_elem:
+        if raw['rating'] is not None:
             try:
-                rating = float((await rating_elem.inner_text()).strip())
+                rating = float(raw['rating'].strip())
             except:
                 pass
 
         # 리뷰 수
         review_count = 0
-        review_box = await page.query_selector('div.prod_review_box')
-        if review_box:
-            review_val = await review_box.query_selector('span.val')
-            if review_val:
-                try:
-                    review_count = int((await review_val.inner_text()).strip())
-                except:
-                    pass
+        if raw['review_count'] is not None:
+            try:
+                review_count = int(raw['review_count'].strip())
+            except:
+                pass
 
         # 짧은 설명
-        description = ""
-        desc_elem = await page.query_selector('span.prod_desc')
-        if desc_elem:
-            description = (await desc_elem.inner_text()).strip()
+        description = (raw['description'] or "").strip()
 
         # 상세 소개글
         intro_text = ""
-        intro_sections = await page.query_selector_all('div.intro_bottom div.info_text')
-        for section in intro_sections:
-            text = (await section.inner_text()).strip()
+        for section_text in raw['intro_sections']:
+            text = section_text.strip()
             if text and len(text) > 50:
                 intro_text += text + "\n\n"
         intro_text = intro_text.strip()
 
-        book_intro = await page.query_selector('div.book_intro div.info_text')
-        if book_intro:
-            book_intro_text = (await book_intro.inner_text()).strip()
+        if raw['book_intro'] is not None:
+            book_intro_text = raw['book_intro'].strip()
             if book_intro_text:
                 intro_text = book_intro_text + "\n\n" + intro_text
 
         # 키워드
         keywords = []
-        keyword_tabs = await page.query_selector_all('div.product_keyword_pick ul.tabs li.tab_item a span')
-        for kw in keyword_tabs:
-            kw_text = (await kw.inner_text()).strip()
-            if kw_text and kw_text != '더보기':
+        for kw in raw['keywords']:
+            kw_text = kw.strip()
+            if kw_text and kw_text not in BLOCKED_KEYWORDS:
                 keywords.append(kw_text)
 
         # 이미지 URL
-        image_url = ""
-        image_meta = await page.query_selector('meta[property="og:image"]')
-        if image_meta:
-            image_url = await image_meta.get_attribute('content') or ""
+        image_url = raw['image_url'] or ""
 
         return {
             'product_code': product_code,
@@ -153,7 +153,7 @@ async def get_book_detail(page, product_code: str) -> dict:
         }
 
     except Exception as e:
-        print(f"    >> 오류: {e}")
+        print(f"    >> {product_code} 오류: {e}")
         return None
 
 
@@ -164,6 +164,18 @@ async def main():
 
     # 중복 제거
     empty_codes = empty_rows['product_code'].unique().tolist()
+
+    # 이전 실행에서 이미 채워진 상품코드는 건너뜀
+    if SUPABASE_ENABLED and empty_codes:
+        try:
+            res = supabase.table('books').select('product_code').in_('product_code', empty_codes).neq('title', '').execute()
+            existing = {row['product_code'] for row in res.data}
+            if existing:
+                empty_codes = [code for code in empty_codes if code not in existing]
+                print(f"이미 채워진 상품코드 {len(existing)}개 건너뜀")
+        except Exception as e:
+            print(f"    >> 기존 데이터 조회 오류: {e}")
+
     print(f"재크롤링할 고유 상품코드: {len(empty_codes)}개")
 
     async with async_playwright() as p:
@@ -172,40 +184,59 @@ async def main():
             user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
             viewport={'width': 1920, 'height': 1080}
         )
-        page = await context.new_page()
+        await context.route("**/*", block_heavy_resources)
 
-        success_count = 0
-        failed_codes = []
+        # 상세 페이지 수집용 페이지 풀
+        page_pool = asyncio.Queue()
+        for _ in range(DETAIL_CONCURRENCY):
+            page_pool.put_nowait(await context.new_page())
 
-        for idx, code in enumerate(empty_codes, 1):
-            print(f"\n[{idx}/{len(empty_codes)}] {code}")
+        updated_rows = []
+        failed_codes = []
 
-            book_data = await get_book_detail(page, code)
+        async def retry_one(idx: int, code: str):
+            page = await page_pool.get()
+            try:
+                book_data = await get_book_detail(page, code)
+                await asyncio.sleep(1)
+            finally:
+                page_pool.put_nowait(page)
 
+            # 동시에 도는 페이지끼리 로그가 섞이지 않도록 책마다 완료 후 한 줄로 출력
             if book_data and book_data['title']:
-                print(f"    >> 성공: {book_data['title'][:30]}...")
-
-                # Supabase 업데이트
-                if SUPABASE_ENABLED:
-                    try:
-                        supabase.table('books').upsert(
-                            book_data,
-                            on_conflict='product_code'
-                        ).execute()
-                    except Exception as e:
-                        print(f"    >> DB 저장 오류: {e}")
-
-                success_count += 1
+                print(f"[{idx}/{len(empty_codes)}] {code} >> 성공: {book_data['title'][:30]}...")
+                updated_rows.append(book_data)
             else:
-                print(f"    >> 실패")
+                print(f"[{idx}/{len(empty_codes)}] {code} >> 실패")
                 failed_codes.append(code)
 
-            await asyncio.sleep(1)
+        await asyncio.gather(*(retry_one(idx, code) for idx, code in enumerate(empty_codes, 1)))
 
         await browser.close()
 
+    # Supabase 업데이트 (크롤링 후 배치 upsert)
+    saved_count = 0
+    if SUPABASE_ENABLED and updated_rows:
+        failed_batches = []
+        for start in range(0, len(updated_rows), UPSERT_BATCH_SIZE):
+            batch = updated_rows[start:start + UPSERT_BATCH_SIZE]
+            try:
+                supabase.table('books').upsert(
+                    batch,
+                    on_conflict='product_code'
+                ).execute()
+                saved_count += len(batch)
+            except Exception as e:
+                print(f"    >> DB 저장 오류 ({start + 1}~{start + len(batch)}번째 행): {e}")
+                failed_batches.append(batch)
+        print(f"[Supabase] books 테이블: {saved_count}개 도서 정보 저장")
+        for batch in failed_batches:
+            print(f"    >> 저장 실패 ({len(batch)}개): {[row['product_code'] for row in batch]}")
+
     print(f"\n{'='*50}")
-    print(f"완료: {success_count}/{len(empty_codes)} 성공")
+    print(f"크롤링: {len(updated_rows)}/{len(empty_codes)}")
+    if SUPABASE_ENABLED:
+        print(f"완료: {saved_count}/{len(empty_codes)} 저장 성공")
     if failed_codes:
         print(f"실패한 코드: {failed_codes}")
     print('='*50)
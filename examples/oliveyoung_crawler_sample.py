@@ -1,15 +1,38 @@
-import requests
-from bs4 import BeautifulSoup
-import time
 import csv
 import os
-from bs4 import BeautifulSoup
-from selenium.common.exceptions import NoSuchElementException
+from lxml import etree, html as lxml_html
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from itertools import zip_longest
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+
+# 페이지 전체 page_source 대신 상품명과 리뷰 목록(#gdasList) HTML 만 한 번의 execute_script 로 가져옴
+REVIEW_LIST_JS = """
+return [
+    document.querySelector('p.prd_name')?.textContent ?? '',
+    document.getElementById('gdasList')?.outerHTML ?? '',
+];
+"""
+
+# 리뷰 목록 HTML 은 lxml 로 파싱하고, 리뷰 필드는 li 단위로 미리 컴파일한 XPath 로 추출
+REVIEW_ITEM_XPATH = etree.XPath('//*[@id="gdasList"]/li')
+REVIEW_TEXT_XPATH = etree.XPath('string(.//div[contains(@class, "txt_inner")])')
+TITLE_SPAN_XPATH = etree.XPath('.//div[contains(@class, "poll_sample")]//span')
+USER_SPAN_XPATH = etree.XPath('.//div[@class="user clrfix"]//span')
+STAR_SPAN_XPATH = etree.XPath('.//div[contains(@class, "score_area")]//span')
+
+# Selenium 셀렉터도 모듈 상수로 고정 (리뷰 탭은 XPath 대신 id 로 바로 조회)
+REVIEW_TAB_SELECTOR = (By.ID, 'reviewInfo')
+# 고정 sleep 대신 리뷰 목록 DOM 변화를 기다리는 데 쓰는 셀렉터
+FIRST_REVIEW_SELECTOR = (By.CSS_SELECTOR, '#gdasList > li')
+PAGE_BUTTON_CSS = 'a[data-page-no="{}"]'
+
+# 상품 크롤링이 연속으로 이 횟수를 넘게 실패하면 (차단 등) 전체 크롤링 중단
+MAX_CONSECUTIVE_FAILURES = 3
+
+# 리뷰 텍스트 추출에 필요 없는 이미지/폰트 요청은 CDP 로 차단 (CSS 는 클릭 가능 여부 판정에 필요해 유지)
+BLOCKED_URL_PATTERNS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.woff', '*.woff2', '*.ttf']
   
 def load_data():
     data = []
@@ -33,35 +56,49 @@ def write_data(data):
         for row in data:
             writer.writerow(row)
 
-def crawl_parse_review_html_write_data(url):
-    
-    driver = webdriver.Chrome()
+def create_driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+
+    driver = webdriver.Chrome(options=options)
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    return driver
+
+def crawl_parse_review_html_write_data(driver, url):
     
     try:
         driver.get(url)
-        WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, '//*[@id="reviewInfo"]'))).click()
-        time.sleep(3)
+        WebDriverWait(driver, 10).until(EC.element_to_be_clickable(REVIEW_TAB_SELECTOR)).click()
+        try:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located(FIRST_REVIEW_SELECTOR))
+        except TimeoutException:
+            # 리뷰 탭은 열렸지만 리뷰가 하나도 없는 상품은 오류가 아닌 빈 결과로 처리
+            print("리뷰가 없는 제품입니다.")
+            return []
+
+        # 상품명은 페이지를 넘겨도 같으므로 첫 페이지 값을 사용
+        product_name = None
 
         for page_num in range(1, 200):
             parse_review_text_list = []
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'lxml')
-
-            product_name_tag = soup.find("p", class_="prd_name")
-            product_name = product_name_tag.text if product_name_tag else []
+            page_product_name, review_list_html = driver.execute_script(REVIEW_LIST_JS)
+            if product_name is None:
+                product_name = page_product_name
+            review_items = REVIEW_ITEM_XPATH(lxml_html.fromstring(review_list_html)) if review_list_html else []
 
-            user_clrfix_tags = soup.find_all("div", class_="user clrfix")
-            review_tags = soup.find_all("div", class_="txt_inner")
-            title_tags = soup.find_all("div", class_="poll_sample")
-            star_tags = soup.find_all("div", class_ = "score_area")
+            for review_li in review_items:
+                title_spans = TITLE_SPAN_XPATH(review_li)
+                user_spans = USER_SPAN_XPATH(review_li)
+                star_spans = STAR_SPAN_XPATH(review_li)
 
-            combined_list = list(zip_longest(title_tags, review_tags, user_clrfix_tags, star_tags, fillvalue=None))
-
-            for title_tag, review_tag, user_clrfix_tag, star_tag in combined_list:
-                review_text = review_tag.text if review_tag else None
-                title_text = [tag.text.strip() for tag in title_tag.find_all("span")[1::2]] if title_tag else None
-                span_text = [span.text.strip() for span in user_clrfix_tag.find_all("span")[1:]] if user_clrfix_tag else None
-                star_text = [star.text.strip() for star in star_tag.find_all("span")][0]
+                review_text = REVIEW_TEXT_XPATH(review_li)
+                title_text = [span.text_content().strip() for span in title_spans[1::2]] if title_spans else None
+                span_text = [span.text_content().strip() for span in user_spans[1:]] if user_spans else None
+                star_text = star_spans[0].text_content().strip() if star_spans else None
 
                 review_data = {
                     "page": page_num,
@@ -76,26 +113,53 @@ def crawl_parse_review_html_write_data(url):
             write_data(parse_review_text_list)
 
             try:
-                next_button = driver.find_element(By.XPATH, f"//a[@data-page-no='{page_num + 1}']")
+                old_first_li = driver.find_element(*FIRST_REVIEW_SELECTOR)
+                next_button = driver.find_element(By.CSS_SELECTOR, PAGE_BUTTON_CSS.format(page_num + 1))
                 next_button.click()
-                time.sleep(3)
+                # 이전 페이지의 첫 리뷰가 DOM 에서 떨어지고 새 리뷰가 붙을 때까지만 대기
+                WebDriverWait(driver, 5).until(EC.staleness_of(old_first_li))
+                WebDriverWait(driver, 5).until(EC.presence_of_element_located(FIRST_REVIEW_SELECTOR))
             except NoSuchElementException:
                 print(f"Page {page_num} is the last page. \n ")
                 break
+            except TimeoutException:
+                print(f"Page {page_num + 1} did not load. \n ")
+                break
 
     finally:
-        driver.quit()
+        # 브라우저는 다음 상품에서 재사용하고 세션 상태만 초기화
+        # (드라이버가 이미 죽은 경우 여기서 난 오류가 원래 예외를 가리지 않도록 무시)
+        try:
+            driver.delete_all_cookies()
+        except WebDriverException as e:
+            print(f"쿠키 초기화 실패: {e.msg}")
     
     return parse_review_text_list
 
 if __name__ == '__main__':
     data = load_data()
     parse_review_list = []
-    
-    for i, review in enumerate(data):
-        url = review["product_link"]
-        try:
-            parse_review = crawl_parse_review_html_write_data(url)
-        except:
-            continue
-        print(f"{i}번 제품 끝")
\ No newline at end of file
+
+    # 상품마다 Chrome 을 새로 띄우지 않고 드라이버 하나를 재사용
+    driver = create_driver()
+    failures = 0
+
+    try:
+        for i, review in enumerate(data):
+            url = review["product_link"]
+            try:
+                parse_review = crawl_parse_review_html_write_data(driver, url)
+                failures = 0
+            except (NoSuchElementException, StaleElementReferenceException, TimeoutException) as e:
+                # 리뷰 탭을 열지 못한 상품만 건너뛰고, 그 밖의 오류는 그대로 드러나게 둠
+                # (리뷰가 없는 상품은 빈 결과로 정상 종료되므로 연속 실패로 세지 않음)
+                # (다음 상품의 driver.get 이 페이지를 새로 불러오므로 별도 refresh 불필요)
+                print(f"{i}번 제품 건너뜀: {e.msg}")
+                failures += 1
+                if failures > MAX_CONSECUTIVE_FAILURES:
+                    print(f"{failures}개 제품이 연속으로 실패하여 크롤링을 중단합니다.")
+                    break
+                continue
+            print(f"{i}번 제품 끝")
+    finally:
+        driver.quit()
\ No newline at end of file
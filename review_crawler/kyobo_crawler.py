@@ -7,10 +7,16 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import json
-from typing import List, Dict
-import time
+import csv
+import os
+from collections import Counter
+from typing import Iterator, List, Dict, Optional
+import math
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import platform
 
@@ -22,6 +28,125 @@ if platform.system() == 'Windows':
     except:
         pass
 
+# 교보문고 리뷰 API
+REVIEW_API_URL = "https://product.kyobobook.co.kr/api/review/list"
+
+# 헤더 설정
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
+}
+
+# 커넥션(TCP/TLS) 재사용과 일시적 오류 재시도를 위한 공용 세션
+session = requests.Session()
+session.headers.update(HEADERS)
+session.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
+# 동시에 요청할 페이지 수와 페이지당 리뷰 수
+PAGE_CONCURRENCY = 8
+PAGE_SIZE = 10
+
+def fetch_review_page(sale_cmdtid: str, page: int) -> Dict:
+    """
+    리뷰 API 한 페이지를 요청해 응답 JSON을 반환합니다.
+    """
+    params = {
+        'page': page,
+        'pageLimit': PAGE_SIZE,
+        'reviewSort': '001',
+        'revwPatrCode': '002',
+        'saleCmdtids': sale_cmdtid,
+        'webToonYsno': 'N',
+        'allYsno': 'N',
+        'revwSummeryYn': 'Y',
+        'saleCmdtid': sale_cmdtid
+    }
+    response = session.get(REVIEW_API_URL, params=params)
+    response.raise_for_status()
+    # 응답 bytes 를 바로 파싱 (requests 의 인코딩 추정/str 디코딩 단계 생략)
+    # json.JSONDecodeError 는 RequestException 이 아니므로 호출 측에서 ValueError 로 함께 처리
+    return json.loads(response.content)
+
+def extract_page_reviews(page: int, data: Dict, total_count: int) -> Optional[List[Dict]]:
+    """
+    리뷰 API 한 페이지 응답에서 리뷰 리스트를 꺼냅니다. 더 가져올 리뷰가 없으면 None을 반환합니다.
+    """
+    page_data = data.get('data') or {}
+    if 'reviewList' not in page_data:
+        print("  >> 리뷰 데이터를 찾을 수 없습니다.")
+        return None
+    
+    reviews = page_data['reviewList']
+    if not reviews:
+        print(f"  >> 페이지 {page}에서 더 이상 리뷰가 없습니다.")
+        return None
+    
+    print(f"  >> 페이지 {page}: {len(reviews)}개 수집 (전체: {total_count}개)")
+    return reviews
+
+def iter_review_pages(sale_cmdtid: str, max_pages: int = 5) -> Iterator[List[Dict]]:
+    """
+    교보문고 API에서 책 리뷰를 페이지 단위로 가져옵니다.
+    1페이지 응답의 totalCount로 실제 페이지 수를 정해 나머지 페이지를 한 번에 요청하고,
+    totalCount가 없으면 빈 페이지가 나올 때까지 PAGE_CONCURRENCY 개씩 나눠 요청합니다.
+    
+    Args:
+        sale_cmdtid: 상품 ID (예: S000217467412)
+        max_pages: 가져올 최대 페이지 수
+    
+    Yields:
+        페이지별 리뷰 정보 리스트 (페이지 순서대로)
+    """
+    print("[페이지 1] 데이터 수집 중...")
+    try:
+        first_page = fetch_review_page(sale_cmdtid, 1)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"  >> 페이지 1 수집 중 오류 발생: {e}")
+        return
+    
+    total_count = (first_page.get('data') or {}).get('totalCount') or 0
+    reviews = extract_page_reviews(1, first_page, total_count)
+    if reviews is None:
+        return
+    yield reviews
+    
+    if total_count > 0:
+        last_page = min(max_pages, math.ceil(total_count / PAGE_SIZE))
+        wave_size = max(last_page - 1, 1)
+    else:
+        last_page = max_pages
+        wave_size = PAGE_CONCURRENCY
+    
+    with ThreadPoolExecutor(max_workers=PAGE_CONCURRENCY) as executor:
+        for wave_start in range(2, last_page + 1, wave_size):
+            pages = range(wave_start, min(wave_start + wave_size, last_page + 1))
+            print(f"[페이지 {pages[0]}-{pages[-1]}] 데이터 수집 중...")
+            futures = [executor.submit(fetch_review_page, sale_cmdtid, page) for page in pages]
+            
+            try:
+                # 결과는 페이지 순서대로 처리
+                for page, future in zip(pages, futures):
+                    try:
+                        data = future.result()
+                    except (requests.exceptions.RequestException, ValueError) as e:
+                        print(f"  >> 페이지 {page} 수집 중 오류 발생: {e}")
+                        return
+                    
+                    reviews = extract_page_reviews(page, data, total_count)
+                    if reviews is None:
+                        return
+                    yield reviews
+            finally:
+                # 중간에 멈춘 경우 아직 시작하지 않은 요청은 보내지 않음
+                for future in futures:
+                    future.cancel()
+
 def fetch_book_reviews(sale_cmdtid: str, max_pages: int = 5) -> List[Dict]:
     """
     교보문고 API에서 책 리뷰 정보를 가져옵니다.
@@ -33,83 +158,35 @@ def fetch_book_reviews(sale_cmdtid: str, max_pages: int = 5) -> List[Dict]:
     Returns:
         리뷰 정보 리스트
     """
-    base_url = "https://product.kyobobook.co.kr/api/review/list"
-    all_reviews = []
-    
-    # 헤더 설정
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
-    }
-    
-    for page in range(1, max_pages + 1):
-        params = {
-            'page': page,
-            'pageLimit': 10,
-            'reviewSort': '001',
-            'revwPatrCode': '002',
-            'saleCmdtids': sale_cmdtid,
-            'webToonYsno': 'N',
-            'allYsno': 'N',
-            'revwSummeryYn': 'Y',
-            'saleCmdtid': sale_cmdtid
-        }
-        
-        try:
-            print(f"[페이지 {page}] 데이터 수집 중...")
-            response = requests.get(base_url, params=params, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # 리뷰 데이터 추출
-            if 'data' in data and 'reviewList' in data['data']:
-                reviews = data['data']['reviewList']
-                total_count = data['data'].get('totalCount', 0)
-                
-                if not reviews:
-                    print(f"  >> 페이지 {page}에서 더 이상 리뷰가 없습니다.")
-                    break
-                
-                all_reviews.extend(reviews)
-                print(f"  >> 페이지 {page}: {len(reviews)}개 수집 (전체: {total_count}개)")
-            else:
-                print("  >> 리뷰 데이터를 찾을 수 없습니다.")
-                break
-            
-            # API 요청 간격 (서버 부하 방지)
-            time.sleep(0.5)
-            
-        except requests.exceptions.RequestException as e:
-            print(f"  >> 페이지 {page} 수집 중 오류 발생: {e}")
-            break
-    
-    return all_reviews
+    return [review for reviews in iter_review_pages(sale_cmdtid, max_pages) for review in reviews]
+
+# 리뷰 API 필드 -> (컬럼명, 필드가 없을 때 기본값)
+REVIEW_COLUMN_MAP = {
+    'cmdtName': ('제목', '정보 없음'),
+    'cmdtcode': ('상품코드', ''),
+    'saleCmdtid': ('상품ID', ''),
+    'revwCntt': ('리뷰_내용', ''),
+    'revwRvgr': ('평점', 0),
+    'revwEmtnKywrName': ('감정키워드', ''),
+    'mmbrId': ('작성자', '익명'),
+    'cretDttm': ('작성일', ''),
+    'reviewRecommendCount': ('도움됨', 0),
+    'reviewCommentCount': ('댓글수', 0),
+}
 
 def parse_reviews_to_dataframe(reviews: List[Dict]) -> pd.DataFrame:
     """
     리뷰 데이터를 DataFrame으로 변환합니다.
+    행 단위 dict 조회 대신 한 번에 DataFrame으로 만든 뒤 컬럼 단위로 정리합니다.
     """
-    parsed_data = []
-    
-    for review in reviews:
-        row = {
-            '제목': review.get('cmdtName', '정보 없음'),
-            '상품코드': review.get('cmdtcode', ''),
-            '상품ID': review.get('saleCmdtid', ''),
-            '리뷰_내용': review.get('revwCntt', '').strip(),
-            '평점': review.get('revwRvgr', 0),
-            '감정키워드': review.get('revwEmtnKywrName', ''),
-            '작성자': review.get('mmbrId', '익명'),
-            '작성일': review.get('cretDttm', '')[:10],  # 날짜만 추출
-            '도움됨': review.get('reviewRecommendCount', 0),
-            '댓글수': review.get('reviewCommentCount', 0)
-        }
-        parsed_data.append(row)
-    
-    return pd.DataFrame(parsed_data)
+    df = pd.json_normalize(reviews).reindex(columns=list(REVIEW_COLUMN_MAP))
+    df = df.fillna({field: default for field, (_, default) in REVIEW_COLUMN_MAP.items()})
+    df = df.rename(columns={field: column for field, (column, _) in REVIEW_COLUMN_MAP.items()})
+    
+    df['리뷰_내용'] = df['리뷰_내용'].str.strip()
+    df['작성일'] = df['작성일'].str[:10]  # 날짜만 추출
+    
+    return df
 
 def main():
     """
@@ -136,23 +213,35 @@ def main():
     print(f"최대 페이지: {max_pages}")
     print()
     
-    # 리뷰 데이터 수집
-    reviews = fetch_book_reviews(sale_cmdtid, max_pages=max_pages)
+    # 리뷰 데이터 수집 - 페이지가 도착하는 대로 CSV에 바로 기록하고, 요약용 집계만 메모리에 유지
+    output_filename = f'kyobo_reviews_{sale_cmdtid}.csv'
+    total_reviews = 0
+    preview_rows = []
+    rating_counts = Counter()
+    emotion_counts = Counter()
     
-    if not reviews:
+    with open(output_filename, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow([column for column, _ in REVIEW_COLUMN_MAP.values()])
+        
+        for reviews in iter_review_pages(sale_cmdtid, max_pages=max_pages):
+            page_df = parse_reviews_to_dataframe(reviews)
+            writer.writerows(page_df.itertuples(index=False))
+            
+            if len(preview_rows) < 3:
+                preview_rows.extend(page_df.head(3 - len(preview_rows)).to_dict('records'))
+            rating_counts.update(page_df['평점'])
+            emotion_counts.update(page_df['감정키워드'])
+            total_reviews += len(page_df)
+    
+    if not total_reviews:
+        os.remove(output_filename)
         print("\n[오류] 수집된 리뷰가 없습니다.")
         return
     
-    print(f"\n[완료] 총 {len(reviews)}개의 리뷰를 수집했습니다.")
+    print(f"\n[완료] 총 {total_reviews}개의 리뷰를 수집했습니다.")
     print()
     
-    # DataFrame 생성
-    df = parse_reviews_to_dataframe(reviews)
-    
-    # CSV 파일로 저장
-    output_filename = f'kyobo_reviews_{sale_cmdtid}.csv'
-    df.to_csv(output_filename, index=False, encoding='utf-8-sig')
-    
     print("=" * 70)
     print(f"[저장 완료] '{output_filename}'")
     print("=" * 70)
@@ -161,7 +250,7 @@ def main():
     # 데이터 미리보기
     print("[데이터 미리보기 - 처음 3개 리뷰]")
     print("-" * 70)
-    for idx, row in df.head(3).iterrows():
+    for idx, row in enumerate(preview_rows):
         print(f"\n[리뷰 {idx+1}]")
         print(f"  제목: {row['제목']}")
         print(f"  평점: {row['평점']}점 / 감정: {row['감정키워드']}")
@@ -173,23 +262,22 @@ def main():
     print("=" * 70)
     print("[통계 정보]")
     print("-" * 70)
-    print(f"  총 리뷰 수: {len(df):,}개")
-    print(f"  평균 평점: {df['평점'].mean():.2f}점")
-    print(f"  최고 평점: {df['평점'].max()}점")
-    print(f"  최저 평점: {df['평점'].min()}점")
+    print(f"  총 리뷰 수: {total_reviews:,}개")
+    print(f"  평균 평점: {sum(score * count for score, count in rating_counts.items()) / total_reviews:.2f}점")
+    print(f"  최고 평점: {max(rating_counts)}점")
+    print(f"  최저 평점: {min(rating_counts)}점")
     print()
     print("  평점 분포:")
-    for score in sorted(df['평점'].unique(), reverse=True):
-        count = len(df[df['평점'] == score])
-        percentage = (count / len(df)) * 100
+    for score in sorted(rating_counts, reverse=True):
+        count = rating_counts[score]
+        percentage = (count / total_reviews) * 100
         bar = '█' * int(percentage / 2)
         print(f"    {score}점: {count:3}개 ({percentage:5.1f}%) {bar}")
     
     print()
     print("  감정 키워드 분포:")
-    emotion_counts = df['감정키워드'].value_counts()
-    for emotion, count in emotion_counts.head(5).items():
-        percentage = (count / len(df)) * 100
+    for emotion, count in emotion_counts.most_common(5):
+        percentage = (count / total_reviews) * 100
         print(f"    {emotion}: {count}개 ({percentage:.1f}%)")
     
     print("=" * 70)
@@ -6,13 +6,18 @@
 - reviews 테이블에 저장
 """
 
+import json
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import csv
 from typing import List, Dict, Optional
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 import platform
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 
 # .env 파일 로드 (상위 디렉토리의 bestseller-crawler/.env 사용)
@@ -43,6 +48,35 @@ except ImportError:
     SUPABASE_ENABLED = False
     print("[Supabase] 라이브러리 미설치 - CSV만 저장됩니다")
 
+# 동시에 리뷰를 수집할 도서 수
+BOOK_CONCURRENCY = 16
+
+# Supabase insert 배치 크기와 동시에 보낼 배치 수
+SUPABASE_BATCH_SIZE = 500
+SUPABASE_CONCURRENCY = 4
+
+# CSV 백업 컬럼 (parse_reviews 결과 키 순서)
+REVIEW_CSV_COLUMNS = ['product_code', 'review_content', 'rating', 'emotion_keyword', 'reviewer_id', 'review_date', 'helpful_count', 'comment_count']
+
+# 교보문고 리뷰 API
+REVIEW_API_URL = "https://product.kyobobook.co.kr/api/review/list"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
+}
+
+# 커넥션(TCP/TLS) 재사용과 일시적 오류 재시도를 위한 공용 세션
+session = requests.Session()
+session.headers.update(HEADERS)
+session.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)),
+))
+
 
 def get_books_from_supabase() -> List[Dict]:
     """
@@ -73,16 +107,8 @@ def fetch_book_reviews(product_code: str, max_pages: int = 30) -> List[Dict]:
     Returns:
         리뷰 정보 리스트
     """
-    base_url = "https://product.kyobobook.co.kr/api/review/list"
     all_reviews = []
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7'
-    }
-
     for page in range(1, max_pages + 1):
         params = {
             'page': page,
@@ -97,10 +123,12 @@ def fetch_book_reviews(product_code: str, max_pages: int = 30) -> List[Dict]:
         }
 
         try:
-            response = requests.get(base_url, params=params, headers=headers)
+            response = session.get(REVIEW_API_URL, params=params)
             response.raise_for_status()
 
-            data = response.json()
+            # 응답 bytes 를 바로 파싱 (requests 의 인코딩 추정/str 디코딩 단계 생략)
+            # json.JSONDecodeError 는 RequestException 이 아니므로 아래에서 ValueError 로 함께 처리
+            data = json.loads(response.content)
 
             if 'data' in data and 'reviewList' in data['data']:
                 reviews = data['data']['reviewList']
@@ -118,7 +146,7 @@ def fetch_book_reviews(product_code: str, max_pages: int = 30) -> List[Dict]:
 
             time.sleep(0.3)  # API 요청 간격
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"    >> 페이지 {page} 수집 중 오류: {e}")
             break
 
@@ -147,26 +175,28 @@ def parse_reviews(reviews: List[Dict]) -> List[Dict]:
     return parsed
 
 
-def save_reviews_to_supabase(reviews: List[Dict]) -> bool:
+def insert_review_batch(batch: List[Dict]) -> bool:
     """
-    리뷰 데이터를 Supabase에 저장
+    리뷰 배치 하나를 reviews 테이블에 insert (실패 시 False)
     """
-    if not SUPABASE_ENABLED or not reviews:
-        return False
-
     try:
-        # 배치로 저장 (한 번에 100개씩)
-        batch_size = 100
-        for i in range(0, len(reviews), batch_size):
-            batch = reviews[i:i + batch_size]
-            supabase.table('reviews').insert(batch).execute()
-
+        supabase.table('reviews').insert(batch).execute()
         return True
     except Exception as e:
-        print(f"    >> Supabase 저장 오류: {e}")
+        print(f"    >> Supabase 저장 오류 ({len(batch)}개): {e}")
         return False
 
 
+def submit_review_batches(executor: ThreadPoolExecutor, pending: List[Dict], batch_futures: List, flush_all: bool = False):
+    """
+    pending 에 쌓인 리뷰를 SUPABASE_BATCH_SIZE 개씩 잘라 insert 를 제출 (flush_all 이면 남은 자투리까지)
+    """
+    while len(pending) >= SUPABASE_BATCH_SIZE or (flush_all and pending):
+        batch = pending[:SUPABASE_BATCH_SIZE]
+        del pending[:SUPABASE_BATCH_SIZE]
+        batch_futures.append((executor.submit(insert_review_batch, batch), batch))
+
+
 def crawl_all_reviews(max_pages_per_book: int = 30):
     """
     books 테이블의 모든 도서에 대해 리뷰 수집
@@ -188,41 +218,61 @@ def crawl_all_reviews(max_pages_per_book: int = 30):
     print()
 
     total_reviews = 0
-    all_reviews_data = []
+    pending = []
+    batch_futures = []
+
+    # CSV 백업은 도서가 끝날 때마다 바로 기록 (중간에 중단돼도 수집분 보존)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"kyobo_reviews_all_{timestamp}.csv"
+
+    # 도서별 리뷰 수집은 스레드 풀에서 동시에 실행하고, 끝난 도서의 리뷰는 500개가 모일 때마다 DB 에 insert
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as f, \
+            ThreadPoolExecutor(max_workers=SUPABASE_CONCURRENCY) as db_executor, \
+            ThreadPoolExecutor(max_workers=BOOK_CONCURRENCY) as executor:
+        writer = csv.DictWriter(f, fieldnames=REVIEW_CSV_COLUMNS, lineterminator='\n')
+        writer.writeheader()
 
-    for idx, book in enumerate(books, 1):
-        product_code = book['product_code']
-        title = book['title'][:30] if book.get('title') else product_code
+        futures = {executor.submit(fetch_book_reviews, book['product_code'], max_pages_per_book): book for book in books}
 
-        print(f"[{idx}/{len(books)}] {title}...")
+        for idx, future in enumerate(as_completed(futures), 1):
+            book = futures[future]
+            product_code = book['product_code']
+            title = book['title'][:30] if book.get('title') else product_code
 
-        # 리뷰 수집
-        reviews = fetch_book_reviews(product_code, max_pages=max_pages_per_book)
+            print(f"[{idx}/{len(books)}] {title}...")
 
-        if reviews:
-            parsed = parse_reviews(reviews)
+            reviews = future.result()
 
-            # Supabase에 저장
-            if save_reviews_to_supabase(parsed):
-                print(f"    >> {len(reviews)}개 리뷰 저장 완료")
+            if reviews:
+                parsed = parse_reviews(reviews)
+                print(f"    >> {len(reviews)}개 리뷰 수집")
+
+                writer.writerows(parsed)
+                f.flush()
+                total_reviews += len(reviews)
+
+                if SUPABASE_ENABLED:
+                    pending.extend(parsed)
+                    submit_review_batches(db_executor, pending, batch_futures)
             else:
-                print(f"    >> {len(reviews)}개 리뷰 수집 (DB 저장 실패)")
-
-            all_reviews_data.extend(parsed)
-            total_reviews += len(reviews)
-        else:
-            print(f"    >> 리뷰 없음")
-
-        time.sleep(0.5)  # 도서 간 대기
-
-    # CSV 백업 저장
-    if all_reviews_data:
-        df = pd.DataFrame(all_reviews_data)
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"kyobo_reviews_all_{timestamp}.csv"
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
+                print(f"    >> 리뷰 없음")
+
+        if SUPABASE_ENABLED:
+            submit_review_batches(db_executor, pending, batch_futures, flush_all=True)
+
+    if total_reviews:
         print(f"\n[CSV 백업] {filename}")
+    else:
+        os.remove(filename)
+
+    # 배치별 결과 집계 (실패한 배치만 따로 보고)
+    if batch_futures:
+        saved = sum(len(batch) for future, batch in batch_futures if future.result())
+        failed_batches = [batch for future, batch in batch_futures if not future.result()]
+        print(f"\n[Supabase] {saved}개 리뷰 저장 완료 ({len(batch_futures) - len(failed_batches)}/{len(batch_futures)} 배치)")
+        for batch in failed_batches:
+            failed_codes = sorted({row['product_code'] for row in batch})
+            print(f"    >> 저장 실패 배치 ({len(batch)}개, CSV 백업 참고): {', '.join(failed_codes)}")
 
     print()
     print("=" * 70)
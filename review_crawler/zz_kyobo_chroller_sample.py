@@ -1,99 +1,152 @@
-import time
-from tqdm import tqdm_notebook
+import asyncio
 import warnings
 warnings.filterwarnings('ignore')
 import pandas as pd
-from playwright.sync_api import sync_playwright
-
-# Playwright 초기화 (Selenium의 driver 역할)
-# 스크립트 실행 시 브라우저가 열립니다.
-# Playwright 초기화 (Selenium의 driver 역할)
-p = sync_playwright().start()
-browser = p.chromium.launch(headless=False)
-page = browser.new_page()
-
-url = "https://product.kyobobook.co.kr/detail/S000210621680"
-page.goto(url)
-
-# 리뷰 탭 클릭 (리뷰 목록 로드)
-try:
-    # 탭이 로드될 때까지 대기 (텍스트로 찾기)
-    page.wait_for_selector('.tab_list_wrap', state='visible', timeout=10000)
-    # '리뷰' 텍스트를 포함하는 탭 클릭
-    page.locator("text=리뷰").first.click()
-    page.wait_for_timeout(2000) # 탭 전환 대기
-except Exception as e:
-    print(f"리뷰 탭 이동 중 오류: {e}")
-
-# 데이터 프레임 생성 (도서 리뷰용 컬럼으로 변경)
-df_review_book = pd.DataFrame(columns=['date', 'rate', 'id', 'content'])
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+# 크롤링할 도서 상세 페이지 목록
+BOOK_URLS = [
+    "https://product.kyobobook.co.kr/detail/S000210621680",
+]
+
+# 동시에 크롤링할 도서 수 (브라우저는 하나, 도서마다 탭 하나)
+MAX_CONCURRENCY = 5
+
+# 리뷰 추출이 연속으로 이 횟수를 넘게 실패하면 해당 도서 크롤링 중단
+MAX_CONSECUTIVE_FAILURES = 3
+
+# 도서 리뷰용 컬럼
+REVIEW_COLUMNS = ['url', 'date', 'rate', 'id', 'content']
+
+# 현재 페이지의 리뷰 아이템을 한 번의 evaluate 로 추출하는 JS
+# 평점은 '4점' 등의 텍스트로 되어 있거나 별점 이미지일 수 있음. 여기서는 klover_score 내의 텍스트 추출 시도.
+REVIEW_ITEMS_JS = """
+(items) => items.map(r => [
+    r.querySelector('.date')?.innerText ?? '',
+    r.querySelector('.klover_score')?.innerText ?? '',
+    r.querySelector('.user_id')?.innerText ?? '',
+    r.querySelector('.comment_text')?.innerText ?? '',
+])
+"""
+
+# 페이지 이동 후 첫 리뷰가 이전 페이지와 달라졌는지 확인하는 JS
+# (이전 페이지 첫 리뷰는 REVIEW_ITEMS_JS 결과를 그대로 넘겨 추가 조회 없이 비교)
+FIRST_REVIEW_CHANGED_JS = """
+(prev) => {
+    const r = document.querySelector('.comment_item');
+    if (r === null) return false;
+    const first = ['.date', '.klover_score', '.user_id', '.comment_text'].map(s => r.querySelector(s)?.innerText ?? '');
+    return first.some((value, i) => value !== prev[i]);
+}
+"""
+
+
+async def open_review_tab(page, url):
+    # 리뷰 탭 클릭 (리뷰 목록 로드)
+    try:
+        await page.goto(url)
+        # 탭이 로드될 때까지 대기 (텍스트로 찾기)
+        await page.wait_for_selector('.tab_list_wrap', state='visible', timeout=10000)
+        # '리뷰' 텍스트를 포함하는 탭 클릭
+        await page.locator("text=리뷰").first.click()
+        await page.wait_for_selector('.comment_list', state='visible', timeout=10000)  # 탭 전환 대기
+    except PlaywrightError as e:
+        print(f"리뷰 탭 이동 중 오류: {e}")
+
 
 # 상품 리뷰 크롤링 함수
-def review_crawling(df, target_page_count):    
-    for current_page in range(1, target_page_count + 1):      
-        print(f"Processing page {current_page}...")
-        
+# 리뷰는 튜플 리스트에 모아 두고 마지막에 DataFrame 을 한 번만 생성
+async def review_crawling(page, url, target_page_count):
+    rows = []
+    failures = 0
+    for current_page in range(1, target_page_count + 1):
+        print(f"[{url}] Processing page {current_page}...")
+
         # 리뷰 아이템 로드 대기
         try:
-            page.wait_for_selector('.comment_list', state='visible', timeout=5000)
-        except:
+            await page.wait_for_selector('.comment_list', state='visible', timeout=5000)
+        except PlaywrightTimeoutError:
             print("리뷰 리스트를 찾을 수 없습니다.")
             break
 
-        # 현재 페이지의 모든 리뷰 아이템 가져오기
-        reviews = page.locator('.comment_item')
-        count = reviews.count()
-        
-        print(f"Found {count} reviews on page {current_page}")
-        
-        for i in range(count):
-            try:
-                review = reviews.nth(i)
-                
-                # 데이터 추출
-                date = review.locator('.date').inner_text() if review.locator('.date').count() > 0 else ""
-                # 평점은 '4점' 등의 텍스트로 되어 있거나 별점 이미지일 수 있음. 여기서는 텍스트 추출 시도.
-                # klover_score 내의 텍스트 추출
-                rate = review.locator('.klover_score').inner_text() if review.locator('.klover_score').count() > 0 else ""
-                id_text = review.locator('.user_id').inner_text() if review.locator('.user_id').count() > 0 else ""
-                content = review.locator('.comment_text').inner_text() if review.locator('.comment_text').count() > 0 else ""
-                
-                # DataFrame에 추가
-                df.loc[len(df)] = [date, rate, id_text, content]
-
-            except Exception as e:
-                print(f"Error parsing review {i}: {e}")
-                pass
+        # 현재 페이지의 모든 리뷰 아이템을 한 번에 추출
+        try:
+            items = await page.eval_on_selector_all('.comment_item', REVIEW_ITEMS_JS)
+            failures = 0
+        except PlaywrightError as e:
+            print(f"Error parsing reviews on page {current_page}: {e}")
+            items = []
+            failures += 1
+            if failures > MAX_CONSECUTIVE_FAILURES:
+                print(f"[{url}] 리뷰 추출이 {failures}회 연속 실패하여 중단합니다.")
+                break
+        count = len(items)
+
+        print(f"[{url}] Found {count} reviews on page {current_page}")
+
+        rows.extend((url, date, rate, id_text, content) for date, rate, id_text, content in items)
 
         # 페이지네이션 처리
         try:
             # 다음 버튼이 있는지 확인
             next_btn = page.locator('.btn_page.next')
-            if next_btn.count() > 0 and next_btn.is_visible():
-                next_btn.click()
-                page.wait_for_timeout(2000) # 페이지 로드 대기
+            if await next_btn.count() > 0 and await next_btn.is_visible():
+                prev_first = items[0] if count > 0 else []
+                await next_btn.click()
+                # 고정 대기 대신 첫 리뷰 내용이 바뀔 때(= 다음 페이지 렌더링)까지만 대기
+                await page.wait_for_function(FIRST_REVIEW_CHANGED_JS, arg=prev_first, timeout=5000)
             else:
                 print("마지막 페이지입니다.")
                 break
-        except Exception as e:
+        except PlaywrightError as e:
             print(f"Pagination error: {e}")
             break
-        
-        print(f'{current_page}페이지 크롤링 완료')
 
-# 스크립트 실행 부분
-if __name__ == "__main__":
+        print(f'[{url}] {current_page}페이지 크롤링 완료')
+
+    return rows
+
+
+async def crawl_book(context, sem, url, target_page_count):
+    """도서 한 권의 리뷰를 새 탭에서 크롤링 (동시 실행 수는 sem 으로 제한)"""
+    async with sem:
+        page = await context.new_page()
+        try:
+            await open_review_tab(page, url)
+            return await review_crawling(page, url, target_page_count)
+        except PlaywrightError as e:
+            # 한 권의 실패가 gather 로 묶인 다른 도서까지 취소시키지 않도록 빈 결과로 처리
+            print(f"[{url}] 크롤링 중 오류: {e}")
+            return []
+        finally:
+            await page.close()
+
+
+async def main(target_page_count):
     print("교보문고 리뷰 크롤링 시작...")
-    
-    # 5페이지만 크롤링 시도 (필요에 따라 수정)
-    review_crawling(df_review_book, 5)
-    
+
+    # 브라우저/컨텍스트는 하나만 띄우고 도서별로 탭을 열어 동시에 크롤링
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False)
+        context = await browser.new_context()
+        try:
+            results = await asyncio.gather(*(crawl_book(context, sem, url, target_page_count) for url in BOOK_URLS))
+        finally:
+            await browser.close()
+
+    rows = [row for book_rows in results for row in book_rows]
+    df_review_book = pd.DataFrame.from_records(rows, columns=REVIEW_COLUMNS)
+
     print("크롤링 완료")
     print(df_review_book.head())
-    
+
     # 결과 저장
     df_review_book.to_csv('kyobo_reviews.csv', index=False, encoding='utf-8-sig')
     print("kyobo_reviews.csv 저장 완료")
-    
-    browser.close()
-    p.stop()
\ No newline at end of file
+
+
+# 스크립트 실행 부분
+if __name__ == "__main__":
+    # 도서당 5페이지만 크롤링 시도 (필요에 따라 수정)
+    asyncio.run(main(5))